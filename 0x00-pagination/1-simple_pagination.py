@@ -5,8 +5,8 @@ This module provides a Server class that allows pagination of a dataset.
 """
 
 from typing import Tuple
-import csv
-from typing import List
+from typing import List, Sequence
+import dataset_registry
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -32,24 +32,33 @@ class Server:
 
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, mapped: bool = False):
         """
         Initializes the class instance.
+
+        Args:
+            mapped (bool, optional): Whether to memory-map the file and
+                decode only the rows of the requested pages, instead of
+                loading every row up front. Defaults to False.
         """
+        self.mapped = mapped
         self.__dataset = None
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """
         Retrieve, cache, and return the dataset.
 
+        The rows are kept by column (see ColumnarDataset), or left in
+        the mapped file (see MappedDataset), and rebuilt as lists of
+        str when they are read. The dataset is shared by every Server
+        of the process (see dataset_registry).
+
         Returns:
-            List[List]: The dataset.
+            Sequence[List]: The dataset.
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            self.__dataset = dataset_registry.dataset(self.DATA_FILE,
+                                                      self.mapped)
 
         return self.__dataset
 
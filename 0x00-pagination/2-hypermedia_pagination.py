@@ -7,7 +7,10 @@ This module provides a Server class that allows pagination of a dataset.
 from typing import Tuple
 import csv
 import math
-from typing import List, Dict
+from itertools import islice
+from typing import List, Dict, Iterator, Sequence, Union
+from dataset_index import DatasetIndex
+import dataset_registry
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -32,36 +35,100 @@ class Server:
     """
 
     DATA_FILE = "Popular_Baby_Names.csv"
+    FIELDS = ('year', 'gender', 'ethnicity', 'name', 'count', 'rank')
 
-    def __init__(self):
+    def __init__(self, mapped: bool = False):
         """
         Initializes the class instance.
+
+        Args:
+            mapped (bool, optional): Whether to memory-map the file and
+                decode only the rows of the requested pages, instead of
+                loading every row up front. Defaults to False.
         """
+        self.mapped = mapped
         self.__dataset = None
+        self.__index = None
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """
         Retrieve, cache, and return the dataset.
 
+        The rows are kept by column (see ColumnarDataset), or left in
+        the mapped file (see MappedDataset), and rebuilt as lists of
+        str when they are read. The dataset is shared by every Server
+        of the process (see dataset_registry).
+
         Returns:
-            List[List]: The dataset.
+            Sequence[List]: The dataset.
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            self.__dataset = dataset_registry.dataset(self.DATA_FILE,
+                                                      self.mapped)
 
         return self.__dataset
 
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+    def index(self) -> DatasetIndex:
+        """
+        Retrieve, cache, and return the secondary indexes of the
+        dataset, one per field of FIELDS, shared like the dataset.
+
+        The indexes are built from the shared dataset of the current
+        file, never from the one this Server may have loaded before the
+        file changed, and this Server then serves the rows of that
+        dataset, so positions and rows always come from the same file.
+
+        Returns:
+            DatasetIndex: The indexes.
+        """
+        if self.__index is None:
+            def build():
+                """ Indexes the current dataset, kept with its index """
+                dataset = dataset_registry.dataset(self.DATA_FILE,
+                                                   self.mapped)
+                return dataset, DatasetIndex(dataset, self.FIELDS)
+
+            self.__dataset, self.__index = dataset_registry.shared(
+                self.DATA_FILE, 'index:{}:{}'.format(
+                    ','.join(self.FIELDS), self.mapped), build)
+
+        return self.__index
+
+    def __positions(self, year: int = None, gender: str = None,
+                    ethnicity: str = None, name: str = None,
+                    sort: str = None) -> Union[Sequence[int], None]:
+        """
+        Returns the positions of the rows matching the filters in the
+        requested order, or None when every row is wanted in file order.
+        """
+        filters = {'year': year, 'gender': gender, 'ethnicity': ethnicity}
+        if sort is None and name is None and \
+                all(value is None for value in filters.values()):
+            return None
+        return self.index().query(filters, {'name': name}, sort)
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 year: int = None, gender: str = None,
+                 ethnicity: str = None, name: str = None,
+                 sort: str = None) -> List[List]:
         """
         Retrieves a specific page of data from the dataset.
 
+        Filtered or sorted pages are served from the secondary indexes
+        (see index()), so only the rows of the page are read.
+
         Args:
             page (int, optional): The page number. Defaults to 1.
             page_size (int, optional): The number of items per page,
                 Defaults to 10.
+            year (int, optional): Keep the births of that year only.
+            gender (str, optional): Keep that gender only.
+            ethnicity (str, optional): Keep that ethnicity only.
+            name (str, optional): Keep the names starting with it,
+                ignoring case.
+            sort (str, optional): The field of FIELDS to sort by,
+                prefixed with '-' for descending order. Defaults to the
+                file order.
 
         Returns:
             List[List]: The data for the specified page.
@@ -70,11 +137,17 @@ class Server:
         assert isinstance(page_size, int) and page > 0
 
         start_index, end_index = index_range(page, page_size)
+        positions = self.__positions(year, gender, ethnicity, name, sort)
         names = self.dataset()
+        if positions is None:
+            return names[start_index:end_index]
 
-        return names[start_index:end_index]
+        return [names[i] for i in positions[start_index:end_index]]
 
-    def get_hyper(self, page: int = 1, page_size: int = 10) -> Dict:
+    def get_hyper(self, page: int = 1, page_size: int = 10,
+                  year: int = None, gender: str = None,
+                  ethnicity: str = None, name: str = None,
+                  sort: str = None) -> Dict:
         """
         Retrieves a specific page of data from the dataset
         and returns it along with pagination information.
@@ -82,6 +155,8 @@ class Server:
         Args:
             page (int): The page number to retrieve (default is 1).
             page_size (int): The number of items per page (default is 10).
+            year, gender, ethnicity, name, sort: The filters and the
+                order of the rows, as for get_page.
 
         Returns:
             dict: A dictionary containing the following information:
@@ -92,13 +167,18 @@ class Server:
                     (or None if on the last page).
                 - 'prev_page': The previous page number
                     (or None if on the first page).
-                - 'total_pages': The total number of pages in the dataset.
+                - 'total_pages': The total number of pages of the
+                    rows matching the filters.
         """
-        dataset = self.get_page(page, page_size)
+        dataset = self.get_page(page, page_size, year, gender, ethnicity,
+                                name, sort)
 
-        assert isinstance(self.__dataset, List)
+        assert isinstance(self.__dataset, Sequence)
 
-        total_pages = math.ceil(len(self.__dataset) / page_size)
+        positions = self.__positions(year, gender, ethnicity, name, sort)
+        if positions is None:
+            positions = self.__dataset
+        total_pages = math.ceil(len(positions) / page_size)
         next_page = None if page >= total_pages else page + 1
         prev_page = None if page <= 1 else page - 1
 
@@ -107,3 +187,78 @@ class Server:
             'next_page': next_page, 'prev_page': prev_page,
             'total_pages': total_pages
         }
+
+    def count_rows(self) -> int:
+        """
+        Counts the rows of the dataset without parsing the file.
+
+        Once the dataset is loaded its length is used. Otherwise the
+        newlines of the file are counted, which assumes that no quoted
+        field spans several lines.
+
+        Returns:
+            int: The number of rows, header excluded.
+        """
+        if self.__dataset is not None:
+            return len(self.__dataset)
+        lines = 0
+        last = b'\n'
+        with open(self.DATA_FILE, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+        if last != b'\n':
+            lines += 1
+        return max(lines - 1, 0)
+
+    def iter_pages(self, page_size: int = 10,
+                   page: int = 1) -> Iterator[List[List]]:
+        """
+        Streams the pages of the dataset straight from the CSV reader,
+        without loading the dataset: only one page is held at a time.
+
+        Args:
+            page_size (int, optional): The number of items per page,
+                Defaults to 10.
+            page (int, optional): The first page to yield. Defaults to 1.
+
+        Yields:
+            List[List]: The data of every page, in order.
+        """
+        assert isinstance(page, int) and page > 0
+        assert isinstance(page_size, int) and page_size > 0
+
+        with open(self.DATA_FILE) as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            rows = islice(reader, (page - 1) * page_size, None)
+            while True:
+                data = list(islice(rows, page_size))
+                if not data:
+                    return
+                yield data
+
+    def iter_hyper(self, page_size: int = 10,
+                   page: int = 1) -> Iterator[Dict]:
+        """
+        Streams the pages of the dataset like iter_pages, along with
+        the pagination information of get_hyper. total_pages comes
+        from count_rows.
+
+        Args:
+            page_size (int, optional): The number of items per page,
+                Defaults to 10.
+            page (int, optional): The first page to yield. Defaults to 1.
+
+        Yields:
+            dict: The same dictionary as get_hyper, for every page.
+        """
+        pages = self.iter_pages(page_size, page)
+        total_pages = math.ceil(self.count_rows() / page_size)
+        for number, dataset in enumerate(pages, page):
+            yield {
+                'page_size': len(dataset), 'page': number, 'data': dataset,
+                'next_page': None if number >= total_pages else number + 1,
+                'prev_page': None if number <= 1 else number - 1,
+                'total_pages': total_pages
+            }
@@ -3,57 +3,254 @@
 Deletion-resilient hypermedia pagination
 """
 
-import csv
+import base64
+import hashlib
+import hmac
 import math
-from typing import List, Dict, Any
+import os
+import struct
+from array import array
+from collections.abc import MutableMapping
+from itertools import islice
+import dataset_registry
+from typing import List, Dict, Any, Iterator, Sequence
+
+
+class LiveIndex:
+    """Positions 0 to size - 1 that were not deleted yet
+
+    Deleted positions are set in a bitmap, one bit per row. The rows
+    are grouped in blocks of BLOCK positions and a Fenwick tree counts
+    the live positions of the blocks, so the rank of a position and
+    the position of the k-th live one are found in O(log(size) + BLOCK)
+    bit operations, however many positions were deleted around them.
+    All this costs about a fifth of a byte per row.
+    """
+    BLOCK = 64
+
+    def __init__(self, size: int):
+        """Every position starts live
+        """
+        self.size = size
+        self.__deleted = bytearray((size + 7) // 8)
+        blocks = -(-size // self.BLOCK)
+        counts = [self.BLOCK] * blocks
+        if size % self.BLOCK:
+            counts[-1] = size % self.BLOCK
+        # tree[i] counts the live positions of the blocks
+        # in (i - lowbit(i), i], blocks being numbered from 1
+        tree = array('i', [0]) + array('i', counts)
+        for i in range(1, blocks + 1):
+            parent = i + (i & -i)
+            if parent <= blocks:
+                tree[parent] += tree[i]
+        self.__tree = tree
+        self.__blocks = blocks
+        self.__count = size
+        self.__top = 1 << blocks.bit_length() if blocks else 0
+
+    def __len__(self) -> int:
+        """Number of live positions
+        """
+        return self.__count
+
+    def __contains__(self, position: int) -> bool:
+        """Whether a position is live
+        """
+        return 0 <= position < self.size and \
+            not self.__deleted[position >> 3] >> (position & 7) & 1
+
+    def discard(self, position: int) -> None:
+        """Delete a live position
+        """
+        if position not in self:
+            return
+        self.__deleted[position >> 3] |= 1 << (position & 7)
+        self.__count -= 1
+        tree = self.__tree
+        i = position // self.BLOCK + 1
+        while i <= self.__blocks:
+            tree[i] -= 1
+            i += i & -i
+
+    def __live_word(self, block: int) -> int:
+        """Bits of the live positions of a block, lowest bit first
+        """
+        start = block * self.BLOCK
+        end = min(start + self.BLOCK, self.size)
+        deleted = int.from_bytes(self.__deleted[start >> 3:(end + 7) >> 3],
+                                 'little')
+        return ~deleted & ((1 << (end - start)) - 1)
+
+    def rank(self, position: int) -> int:
+        """Number of live positions before a position
+        """
+        position = min(position, self.size)
+        block, offset = divmod(position, self.BLOCK)
+        tree = self.__tree
+        total = 0
+        i = block
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        if offset:
+            word = self.__live_word(block) & ((1 << offset) - 1)
+            total += bin(word).count('1')
+        return total
+
+    def select(self, k: int) -> int:
+        """Position of the live position of rank k (starting at 0),
+        size if there are not that many
+        """
+        if k >= self.__count:
+            return self.size
+        tree = self.__tree
+        block = 0
+        step = self.__top
+        while step:
+            following = block + step
+            if following <= self.__blocks and tree[following] <= k:
+                block = following
+                k -= tree[following]
+            step >>= 1
+        word = self.__live_word(block)
+        for _ in range(k):
+            word &= word - 1
+        return block * self.BLOCK + (word & -word).bit_length() - 1
+
+    def __iter__(self) -> Iterator[int]:
+        """Live positions, in order
+        """
+        return self.iter_from(0)
+
+    def iter_from(self, position: int) -> Iterator[int]:
+        """Live positions from a position on, in order, with one
+        select per block visited
+        """
+        k = self.rank(position)
+        while k < self.__count:
+            first = self.select(k)
+            block = first // self.BLOCK
+            word = self.__live_word(block) >> (first - block * self.BLOCK)
+            while word:
+                yield first + (word & -word).bit_length() - 1
+                word &= word - 1
+                k += 1
+
+
+class IndexedDataset(MutableMapping):
+    """Rows of a dataset by sorting position, without the deleted ones
+
+    A view over the dataset and a LiveIndex: no row is copied, so the
+    positions cost a few bits per row instead of a dict entry.
+    Rows can be deleted, not replaced.
+    """
+
+    def __init__(self, dataset: Sequence[List]):
+        """View over every row of dataset
+        """
+        self.dataset = dataset
+        self.live = LiveIndex(len(dataset))
+
+    def __getitem__(self, index: int) -> List:
+        """Row at a live position
+        """
+        if index not in self.live:
+            raise KeyError(index)
+        return self.dataset[index]
+
+    def __setitem__(self, index: int, row: List) -> None:
+        """Rows cannot be added or replaced
+        """
+        raise TypeError("IndexedDataset only supports deletion")
+
+    def __delitem__(self, index: int) -> None:
+        """Delete the row at a live position
+        """
+        if index not in self.live:
+            raise KeyError(index)
+        self.live.discard(index)
+
+    def __contains__(self, index: object) -> bool:
+        """Whether a position is live
+        """
+        return isinstance(index, int) and index in self.live
+
+    def __iter__(self) -> Iterator[int]:
+        """Live positions, in order
+        """
+        return iter(self.live)
+
+    def __len__(self) -> int:
+        """Number of live rows
+        """
+        return len(self.live)
 
 
 class Server:
     """Server class to paginate a database of popular baby names.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
+    # a cursor holds a position and the data file identity, then a MAC
+    CURSOR = struct.Struct('<Q8s')
+    MAC_SIZE = 16
 
-    def __init__(self):
+    def __init__(self, secret: bytes = None):
+        """secret signs the cursors of get_cursor_page; servers sharing
+        it accept each other's cursors. Defaults to a random key.
+        """
         self.__dataset = None
         self.__indexed_dataset = None
+        self.__file_id = None
+        self.__secret = os.urandom(32) if secret is None else secret
 
-    def dataset(self) -> List[List]:
-        """Cached dataset
+    def dataset(self) -> Sequence[List]:
+        """Cached dataset, kept by column and shared by every Server
+        of the process
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            path = os.path.abspath(self.DATA_FILE)
+            self.__file_id = hashlib.blake2b(path.encode(),
+                                             digest_size=8).digest()
+            self.__dataset = dataset_registry.dataset(self.DATA_FILE)
 
         return self.__dataset
 
-    def indexed_dataset(self) -> Dict[int, List]:
-        """Dataset indexed by sorting position, starting at 0
+    def indexed_dataset(self) -> IndexedDataset:
+        """Dataset indexed by sorting position, starting at 0,
+        computed lazily over dataset()
         """
         if self.__indexed_dataset is None:
-            dataset = self.dataset()
-            truncated_dataset = dataset[:1000]
-            self.__indexed_dataset = {
-                i: dataset[i] for i in range(len(dataset))
-            }
+            self.__indexed_dataset = IndexedDataset(self.dataset())
         return self.__indexed_dataset
 
+    def live_index(self) -> LiveIndex:
+        """Positions of the rows that were not deleted
+        """
+        return self.indexed_dataset().live
+
+    def delete(self, index: int) -> None:
+        """Delete the row at a sorting position; the positions of the
+        other rows do not change
+        """
+        del self.indexed_dataset()[index]
+
     def get_hyper_index(
         self, index: int = None, page_size: int = 10
             ) -> Dict[str, Any]:
-        """Return a page of the dataset.
+        """Return the page of the page_size rows still live from index,
+        found through the live index in O(log(n) + page_size)
         """
+        indexed_dataset = self.indexed_dataset()
+        live_index = self.live_index()
         assert index is not None and index >= 0 and\
-            index < len(self.__indexed_dataset)
+            index < live_index.size
 
-        indexed_dataset = self.indexed_dataset()
-        data = []
-        next_index = index
-        while len(data) < page_size and next_index < len(indexed_dataset):
-            if next_index in indexed_dataset:
-                data.append(indexed_dataset[next_index])
-            next_index += 1
+        positions = list(islice(live_index.iter_from(index), page_size))
+        data = [indexed_dataset.dataset[i] for i in positions]
+        next_index = live_index.size
+        if positions and len(positions) == page_size:
+            next_index = positions[-1] + 1
 
         return {
             'index': index,
@@ -61,3 +258,72 @@ class Server:
             'page_size': page_size,
             'data': data
         }
+
+    def __mac(self, payload: bytes) -> bytes:
+        """Signature of a cursor payload
+        """
+        digest = hmac.new(self.__secret, payload, hashlib.sha256).digest()
+        return digest[:self.MAC_SIZE]
+
+    def __encode_cursor(self, index: int) -> str:
+        """Opaque, signed cursor pointing at a sorting position
+        """
+        payload = self.CURSOR.pack(index, self.__file_id)
+        token = base64.urlsafe_b64encode(payload + self.__mac(payload))
+        return token.rstrip(b'=').decode()
+
+    def __decode_cursor(self, cursor: str) -> int:
+        """Sorting position of a cursor, which must have been signed by
+        this secret for this data file and point at one of its rows;
+        raises ValueError otherwise
+        """
+        size = self.CURSOR.size + self.MAC_SIZE
+        raw = b''
+        if isinstance(cursor, str) and len(cursor) == -(-size * 4 // 3):
+            try:
+                raw = base64.b64decode(cursor + '=' * (-len(cursor) % 4),
+                                       altchars=b'-_', validate=True)
+            except ValueError:
+                raw = b''
+        if len(raw) != size:
+            raise ValueError("invalid cursor")
+        payload, mac = raw[:self.CURSOR.size], raw[self.CURSOR.size:]
+        if not hmac.compare_digest(mac, self.__mac(payload)):
+            raise ValueError("invalid cursor")
+        index, file_id = self.CURSOR.unpack(payload)
+        if file_id != self.__file_id or index >= self.live_index().size:
+            raise ValueError("invalid cursor")
+        return index
+
+    def get_cursor_page(
+        self, cursor: str = None, page_size: int = 10
+            ) -> Dict[str, Any]:
+        """Return the page starting at an opaque cursor (None for the
+        first page) with the cursor of the next page (None on the last).
+
+        Cursors are keyset positions: deleting rows does not shift the
+        following pages, nor does appending rows to the data file, so
+        cursors stay valid across appends. A page costs
+        O(log(n) + page_size) however deep it is. A cursor that was
+        tampered with, that was made for another data file, or that
+        points past the rows this Server loaded (the file was cut
+        short) raises ValueError. A file rewritten in place is not
+        detected: its cursors point at the same positions.
+        """
+        assert isinstance(page_size, int) and page_size > 0
+        indexed_dataset = self.indexed_dataset()
+        index = 0 if cursor is None else self.__decode_cursor(cursor)
+
+        positions = list(islice(self.live_index().iter_from(index),
+                                page_size + 1))
+        next_cursor = None
+        if len(positions) > page_size:
+            next_cursor = self.__encode_cursor(positions.pop())
+        data = [indexed_dataset.dataset[i] for i in positions]
+
+        return {
+            'cursor': cursor,
+            'next_cursor': next_cursor,
+            'page_size': len(data),
+            'data': data
+        }
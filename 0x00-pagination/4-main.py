@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Main file
+"""
+
+Server = __import__('2-hypermedia_pagination').Server
+
+server = Server()
+
+# rows of one year and gender, in file order
+print(server.get_page(1, 3, year=2016, gender="FEMALE"))
+print("---")
+# names starting with "Ol", ignoring case, most popular first
+print(server.get_page(1, 3, name="ol", sort="-count"))
+print("---")
+# every row, sorted by name
+print(server.get_page(1, 3, sort="name"))
+print("---")
+res = server.get_hyper(1, 5, year=2011, ethnicity="HISPANIC", sort="rank")
+print(res.get('total_pages'), res.get('next_page'))
+print(server.get_hyper(res.get('next_page'), 5, year=2011,
+                       ethnicity="HISPANIC", sort="rank"))
+print("---")
+# a value no row holds gives an empty page
+print(server.get_hyper(1, 5, year=1900))
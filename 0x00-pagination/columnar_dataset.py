@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+"""
+This module provides a ColumnarDataset class that keeps a CSV
+file in memory column by column instead of row by row.
+"""
+
+import csv
+from array import array
+from typing import Iterable, List, Sequence, Union
+
+
+class Column:
+    """
+    Holds the values of one CSV column.
+
+    A column starts as an array of 32-bit integers, widened to 64 bits
+    when needed, and stays one as long as every value is the canonical
+    text of an integer (str(int(value)) gives the value back), so that
+    reading it returns the same text.
+    Otherwise it switches to dictionary encoding: every distinct text
+    is stored once in values, and codes holds its position per row.
+
+    Attributes:
+        integers (array): The integers of the rows, or None.
+        values (List[str]): The distinct texts of the column.
+        codes (array): The position in values of every row's text.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty integer column.
+        """
+        self.integers = array('i')
+        self.values = []
+        self.codes = None
+        self.__lookup = {}
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows.
+        """
+        if self.integers is not None:
+            return len(self.integers)
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Returns the text of a row.
+        """
+        if self.integers is not None:
+            return str(self.integers[index])
+        return self.values[self.codes[index]]
+
+    def append(self, text: str) -> None:
+        """
+        Adds the text of the next row.
+
+        Args:
+            text (str): The value read from the CSV file.
+        """
+        if self.integers is not None:
+            try:
+                number = int(text)
+            except ValueError:
+                number = None
+            if number is not None and str(number) == text:
+                try:
+                    self.integers.append(number)
+                    return
+                except OverflowError:
+                    if self.integers.typecode == 'i':
+                        self.integers = array('q', self.integers)
+                        return self.append(text)
+            self.__encode()
+        code = self.__lookup.get(text)
+        if code is None:
+            code = len(self.values)
+            if code == 1 << 16 and self.codes.typecode == 'H':
+                self.codes = array('I', self.codes)
+            self.values.append(text)
+            self.__lookup[text] = code
+        self.codes.append(code)
+
+    def code(self, text: str) -> Union[int, None]:
+        """
+        Returns the code of a text, or None if no row holds it.
+        """
+        return self.__lookup.get(text)
+
+    def __encode(self) -> None:
+        """
+        Switches the column from integers to dictionary encoding.
+        """
+        integers, self.integers = self.integers, None
+        self.codes = array('H')
+        for number in integers:
+            self.append(str(number))
+
+
+class ColumnarDataset(Sequence):
+    """
+    ColumnarDataset is a read-only list of CSV rows stored by column.
+
+    A row of the usual list of lists costs a list and one str object
+    per field, several hundred bytes. Here a row costs 4 (or 8) bytes
+    per integer column and 2 (or 4) bytes per text column, repeated texts
+    such as genders or ethnicities being stored once. Rows are
+    rebuilt as lists of str only when they are read, so they compare
+    equal to the rows of csv.reader.
+
+    Attributes:
+        header (List[str]): The names of the columns.
+        columns (List[Column]): The columns.
+    """
+
+    def __init__(self, rows: Iterable[List[str]],
+                 header: List[str] = None):
+        """
+        Builds the columns from rows of text.
+
+        Args:
+            rows (Iterable[List[str]]): The rows, such as a csv.reader.
+            header (List[str], optional): The names of the columns.
+
+        Raises:
+            ValueError: If the rows do not all have the same length.
+        """
+        self.header = header
+        self.columns = []
+        self.__length = 0
+        for row in rows:
+            if not self.columns:
+                self.columns = [Column() for _ in row]
+            if len(row) != len(self.columns):
+                raise ValueError("row {} has {} fields instead of {}"
+                                 .format(self.__length, len(row),
+                                         len(self.columns)))
+            for column, text in zip(self.columns, row):
+                column.append(text)
+            self.__length += 1
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'ColumnarDataset':
+        """
+        Loads a CSV file whose first row is the header.
+
+        Args:
+            path (str): The CSV file.
+
+        Returns:
+            ColumnarDataset: The rows of the file, header excluded.
+        """
+        with open(path) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            return cls(reader, header)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows.
+        """
+        return self.__length
+
+    def __getitem__(self, index: Union[int, slice]) -> List:
+        """
+        Returns a row, or a list of rows for a slice.
+
+        Args:
+            index (Union[int, slice]): The position of the row(s).
+
+        Returns:
+            List: The row as a list of str, or a list of rows.
+        """
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dataset index out of range")
+        return self.row(index)
+
+    def row(self, index: int) -> List[str]:
+        """
+        Rebuilds the row at a valid, non-negative position.
+        """
+        return [column[index] for column in self.columns]
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""
+This module provides a DatasetIndex class that filters and sorts
+the rows of a dataset through secondary indexes built once.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Sequence, Tuple
+
+
+class FieldIndex:
+    """
+    Secondary index of one column.
+
+    The distinct values of the column are sorted (as integers when they
+    all are, case-insensitively otherwise) and numbered. codes gives
+    the number of the value of every row, and order lists the rows by
+    value then by position, starts[c] being where the rows of value c
+    begin in order. The rows holding a value, or a range of values,
+    are thus a slice of order, in file order for a single value.
+
+    Attributes:
+        values (List[str]): The distinct values, sorted.
+        keys (List): The sort key of every value.
+        codes (array): The code of the value of every row.
+        order (array): The positions sorted by value, then position.
+        starts (array): Where the rows of every value start in order.
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        """
+        Builds the index of the values of a column.
+
+        Args:
+            texts (Sequence[str]): The value of every row.
+        """
+        distinct = set(texts)
+        if all(text.lstrip('-').isdigit() and str(int(text)) == text
+               for text in distinct):
+            self.keys = sorted(int(text) for text in distinct)
+            self.values = [str(key) for key in self.keys]
+        else:
+            self.values = sorted(distinct, key=lambda t: (t.casefold(), t))
+            self.keys = [text.casefold() for text in self.values]
+        self.__lookup = {text: code for code, text in enumerate(self.values)}
+        typecode = 'H' if len(self.values) <= 1 << 16 else 'I'
+        self.codes = array(typecode, (self.__lookup[text] for text in texts))
+        counts = [0] * (len(self.values) + 1)
+        for code in self.codes:
+            counts[code + 1] += 1
+        for code in range(len(self.values)):
+            counts[code + 1] += counts[code]
+        self.starts = array('i', counts)
+        order = array('i', bytes(4 * len(self.codes)))
+        cursors = counts[:-1]
+        for position, code in enumerate(self.codes):
+            order[cursors[code]] = position
+            cursors[code] += 1
+        self.order = order
+
+    def code(self, text: str) -> int:
+        """
+        Returns the code of a value, or None if no row holds it.
+        """
+        return self.__lookup.get(text)
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """
+        Returns the range of the codes of the values starting with
+        prefix, ignoring case.
+        """
+        assert not self.keys or isinstance(self.keys[0], str)
+        prefix = prefix.casefold()
+        low = bisect_left(self.keys, prefix)
+        high = low
+        while high < len(self.keys) and self.keys[high].startswith(prefix):
+            high += 1
+        return low, high
+
+    def rows(self, low: int, high: int) -> array:
+        """
+        Returns the positions of the rows whose code is in [low, high).
+        """
+        return self.order[self.starts[low]:self.starts[high]]
+
+
+class DatasetIndex:
+    """
+    DatasetIndex answers filtered and sorted queries over a dataset.
+
+    A FieldIndex is built for every column when the DatasetIndex is
+    created. A query starts from the most selective filter, whose rows
+    are a slice of its index, and checks the other filters on the codes
+    of those rows only. Without filters, a sorted query is a slice of
+    the order of the sort field. The positions matching the last
+    CACHE_SIZE queries are kept, so the following pages of a query and
+    its number of pages cost no more than a slice. The cache is guarded
+    by a lock, since a shared index serves every thread of a process;
+    queries themselves run outside of it.
+
+    Attributes:
+        fields (Tuple[str]): The name given to every column.
+        indexes (Dict[str, FieldIndex]): The index of every field.
+    """
+
+    CACHE_SIZE = 64
+
+    def __init__(self, dataset: Sequence[List[str]], fields: Sequence[str]):
+        """
+        Indexes every column of a dataset.
+
+        Args:
+            dataset (Sequence[List[str]]): The rows.
+            fields (Sequence[str]): The name of every column.
+        """
+        self.fields = tuple(fields)
+        columns = [[] for _ in self.fields]
+        for row in dataset:
+            for column, text in zip(columns, row):
+                column.append(text)
+        self.indexes = {}
+        for field, column in zip(self.fields, columns):
+            self.indexes[field] = FieldIndex(column)
+        self.__size = len(dataset)
+        self.__cache = OrderedDict()
+        self.__lock = Lock()
+
+    def query(self, filters: Dict[str, str] = None,
+              prefixes: Dict[str, str] = None,
+              sort: str = None) -> Sequence[int]:
+        """
+        Returns the positions of the rows matching every filter.
+
+        Args:
+            filters (Dict[str, str], optional): The exact value
+                required for some fields.
+            prefixes (Dict[str, str], optional): The start required
+                for the value of some fields, ignoring case.
+            sort (str, optional): The field to sort by, prefixed with
+                '-' for descending order. Rows with equal values, and
+                all rows when sort is None, stay in file order.
+
+        Returns:
+            Sequence[int]: The positions of the matching rows.
+        """
+        filters = {field: value for field, value in (filters or {}).items()
+                   if value is not None}
+        prefixes = {field: value for field, value
+                    in (prefixes or {}).items() if value is not None}
+        key = (tuple(sorted(filters.items())),
+               tuple(sorted(prefixes.items())), sort)
+        with self.__lock:
+            positions = self.__cache.get(key)
+            if positions is not None:
+                self.__cache.move_to_end(key)
+                return positions
+        positions = self.__query(filters, prefixes, sort)
+        with self.__lock:
+            self.__cache[key] = positions
+            if len(self.__cache) > self.CACHE_SIZE:
+                self.__cache.popitem(last=False)
+        return positions
+
+    def __query(self, filters: Dict[str, str], prefixes: Dict[str, str],
+                sort: str) -> Sequence[int]:
+        """
+        Computes the positions of a query.
+        """
+        descending = sort is not None and sort.startswith('-')
+        sort_field = sort[1:] if descending else sort
+        assert sort_field is None or sort_field in self.indexes
+        ranges = []
+        for field, value in filters.items():
+            assert field in self.indexes
+            code = self.indexes[field].code(str(value))
+            if code is None:
+                return array('i')
+            ranges.append((field, code, code + 1))
+        for field, prefix in prefixes.items():
+            assert field in self.indexes and isinstance(prefix, str)
+            ranges.append((field,) + self.indexes[field].prefix_range(prefix))
+        if not ranges:
+            if sort_field is None:
+                return range(self.__size)
+            return self.__sorted_all(sort_field, descending)
+
+        def size(entry):
+            """ Number of rows of a range """
+            starts = self.indexes[entry[0]].starts
+            return starts[entry[2]] - starts[entry[1]]
+
+        ranges.sort(key=size)
+        field, low, high = ranges[0]
+        candidates = self.indexes[field].rows(low, high)
+        if high - low > 1:
+            candidates = array('i', sorted(candidates))
+        for field, low, high in ranges[1:]:
+            codes = self.indexes[field].codes
+            candidates = array('i', (position for position in candidates
+                                     if low <= codes[position] < high))
+        if sort_field is not None:
+            codes = self.indexes[sort_field].codes
+            candidates = array('i', sorted(
+                candidates, key=codes.__getitem__, reverse=descending))
+        return candidates
+
+    def __sorted_all(self, field: str, descending: bool) -> Sequence[int]:
+        """
+        Returns every position sorted by a field.
+        """
+        index = self.indexes[field]
+        if not descending:
+            return index.order
+        order = array('i')
+        for code in range(len(index.values) - 1, -1, -1):
+            order.extend(index.rows(code, code + 1))
+        return order
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+This module provides a process-wide registry of the datasets loaded
+from CSV files, so that every Server of a process shares them.
+"""
+
+import gc
+import os
+from columnar_dataset import ColumnarDataset
+from mapped_dataset import MappedDataset
+from threading import RLock
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# (absolute path, kind) -> ((size, mtime), value)
+_registry: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
+# reentrant, since a loader may need another shared value
+_lock = RLock()
+
+
+def shared(path: str, kind: str, loader: Callable[[], Any]) -> Any:
+    """
+    Returns the value built from a file, building it on first use.
+
+    The value is kept for the whole process and rebuilt only when the
+    size or the modification time of the file changes, so every caller
+    gets the same object. A replaced value is not closed, since callers
+    may still hold it; a MappedDataset is unmapped once unreferenced.
+
+    Args:
+        path (str): The file the value is built from.
+        kind (str): What is built from the file, since one file can
+            give several values (a dataset, its indexes...).
+        loader (Callable[[], Any]): Builds the value.
+
+    Returns:
+        Any: The value.
+    """
+    key = (os.path.abspath(path), kind)
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        entry = _registry.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, loader())
+            _registry[key] = entry
+    return entry[1]
+
+
+def dataset(path: str, mapped: bool = False) -> Sequence[List]:
+    """
+    Returns the shared dataset of a CSV file.
+
+    Args:
+        path (str): The CSV file, whose first row is the header.
+        mapped (bool, optional): Whether to memory-map the file (see
+            MappedDataset) rather than load it by column (see
+            ColumnarDataset). Defaults to False.
+
+    Returns:
+        Sequence[List]: The rows of the file, header excluded.
+    """
+    if mapped:
+        return shared(path, 'mapped', lambda: MappedDataset(path))
+    return shared(path, 'columnar', lambda: ColumnarDataset.from_csv(path))
+
+
+def preload(*paths: str, mapped: bool = False) -> None:
+    """
+    Loads datasets before the workers of a pre-fork server start.
+
+    Forked workers then find the datasets in the registry and share
+    their memory with the master copy-on-write. A mapped dataset lives
+    in the page cache and is fully shared. Of a columnar dataset, the
+    arrays of integers and codes are never written and stay shared,
+    but reading a row changes the reference counts of the str objects
+    of its text columns (Column.values), so the pages holding those
+    distinct texts are copied in every worker that reads them. The
+    objects loaded so far are also moved out of the reach of the
+    garbage collector (gc.freeze), whose passes would otherwise write
+    to all of them and copy their pages in every worker.
+
+    Args:
+        paths (str): The CSV files.
+        mapped (bool, optional): Whether to memory-map them.
+    """
+    for path in paths:
+        dataset(path, mapped)
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def clear() -> None:
+    """
+    Forgets every shared value.
+    """
+    with _lock:
+        _registry.clear()
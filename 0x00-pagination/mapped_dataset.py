@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""
+This module provides a MappedDataset class that serves the rows
+of a memory-mapped CSV file through an index of row offsets.
+"""
+
+import csv
+import io
+import mmap
+import os
+import struct
+from array import array
+from typing import List, Sequence, Union
+
+
+class MappedDataset(Sequence):
+    """
+    MappedDataset is a read-only list of the rows of a CSV file.
+
+    The file is memory-mapped and only the byte offset of every row is
+    kept in memory (8 bytes per row). Reading rows decodes the bytes of
+    those rows only, so a page costs the same whatever the file size.
+
+    The offsets are found once by a CSV-aware scan (quoted fields may
+    hold newlines) and cached in a side file, path + INDEX_SUFFIX,
+    which is trusted as long as the size and modification time of the
+    CSV file did not change. A side file that cannot be written is
+    simply not cached.
+
+    Attributes:
+        path (str): The CSV file.
+        header (List[str]): The names of the columns.
+    """
+
+    INDEX_SUFFIX = '.idx'
+    INDEX_MAGIC = b'CSVIDX01'
+    INDEX_HEADER = struct.Struct('<8sqq')
+
+    def __init__(self, path: str):
+        """
+        Maps a CSV file whose first row is the header.
+
+        Args:
+            path (str): The CSV file.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size:
+                self.__mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.__mm = b''
+        self.__stamp = (stat.st_size, stat.st_mtime_ns)
+        self.__offsets = self.__read_index()
+        if self.__offsets is None:
+            self.__offsets = self.__scan()
+            self.__write_index()
+        header = self.__decode(0, 1)
+        self.header = header[0] if header else None
+
+    def __scan(self) -> array:
+        """
+        Returns the offset of every row, followed by the end offset.
+        """
+        mm = self.__mm
+        offsets = array('q')
+        if not mm:
+            return array('q', [0])
+        # where the last line read by the csv reader ends
+        last_end = 0
+
+        def lines():
+            """ Yields the lines of the file, noting where rows start """
+            nonlocal last_end
+            position = 0
+            while position < len(mm):
+                end = mm.find(b'\n', position)
+                end = len(mm) if end < 0 else end + 1
+                last_end = end
+                yield mm[position:end].decode()
+                position = end
+
+        reader = csv.reader(lines())
+        start = 0
+        for _ in reader:
+            offsets.append(start)
+            start = last_end
+        offsets.append(start)
+        return offsets
+
+    def __index_path(self) -> str:
+        """
+        Returns the path of the cached index.
+        """
+        return self.path + self.INDEX_SUFFIX
+
+    def __read_index(self) -> Union[array, None]:
+        """
+        Returns the cached offsets, or None if they are missing or stale.
+        """
+        try:
+            with open(self.__index_path(), 'rb') as f:
+                header = f.read(self.INDEX_HEADER.size)
+                data = f.read()
+        except OSError:
+            return None
+        if len(header) != self.INDEX_HEADER.size:
+            return None
+        magic, size, mtime = self.INDEX_HEADER.unpack(header)
+        if magic != self.INDEX_MAGIC or (size, mtime) != self.__stamp or \
+                not data or len(data) % 8:
+            return None
+        offsets = array('q')
+        offsets.frombytes(data)
+        return offsets
+
+    def __write_index(self) -> None:
+        """
+        Caches the offsets next to the CSV file, if allowed.
+        """
+        path = self.__index_path()
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC,
+                                               *self.__stamp))
+                f.write(self.__offsets.tobytes())
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def __decode(self, start: int, end: int) -> List[List[str]]:
+        """
+        Parses the rows between two positions of the file, header
+        included (row 0 is the header).
+        """
+        offsets = self.__offsets
+        end = min(end, len(offsets) - 1)
+        if start >= end:
+            return []
+        text = self.__mm[offsets[start]:offsets[end]].decode()
+        return list(csv.reader(io.StringIO(text, newline='')))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows, header excluded.
+        """
+        return max(len(self.__offsets) - 2, 0)
+
+    def __getitem__(self, index: Union[int, slice]) -> List:
+        """
+        Returns a row, or a list of rows for a slice.
+
+        Args:
+            index (Union[int, slice]): The position of the row(s).
+
+        Returns:
+            List: The row as a list of str, or a list of rows.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.__decode(start + 1, stop + 1)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dataset index out of range")
+        return self.__decode(index + 1, index + 2)[0]
+
+    def close(self) -> None:
+        """
+        Unmaps the file.
+        """
+        if self.__mm:
+            self.__mm.close()
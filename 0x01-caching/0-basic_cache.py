@@ -6,25 +6,47 @@ inherits from BaseCaching class.
 """
 
 from base_caching import BaseCaching
+from collections import OrderedDict
 
 
 class BasicCache(BaseCaching):
     """
     BasicCache class that inherits from BaseCaching class.
+
+    A BasicCache never evicts, so it has no capacity and its items
+    only leave it when they expire.
     """
 
-    def put(self, key, item):
+    def __init__(self, max_items=None, max_weight=None, **kwargs):
+        """ Initialize
+
+        Args:
+            max_items: Ignored, a BasicCache keeps every item.
+            max_weight: Not supported, since nothing is ever evicted
+                to honor it.
+            kwargs: Other BaseCaching arguments, such as ttl.
+        """
+        if max_weight is not None:
+            raise ValueError("BasicCache has no capacity to weigh")
+        super().__init__(max_items=max_items, **kwargs)
+        self.max_items = None
+        # ordered, so that a snapshot is restored in its saved order
+        self.cache_data = OrderedDict()
+
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache.
 
         Args:
             key: The key of the item.
             item: The item to be added.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
 
         Returns:
             None
         """
         if key is not None and item is not None:
             self.cache_data[key] = item
+            self._schedule(key, ttl)
 
     def get(self, key):
         """ Get an item by key.
@@ -36,4 +58,5 @@ class BasicCache(BaseCaching):
             The item associated with the key,
                 or None if the key is not found.
         """
+        self._expired(key)
         return self.cache_data.get(key, None)
@@ -6,43 +6,84 @@ using the BaseCaching class.
 """
 
 from base_caching import BaseCaching
-from collections import deque
+from collections import OrderedDict
 
 
 class FIFOCache(BaseCaching):
     """
     FIFOCache class that inherits from BaseCaching.
+
+    cache_data is an OrderedDict kept in insertion order, so
+    overwrites, evictions and lookups are all O(1).
     """
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """
         Initializes an instance of the FIFOCache class.
+
+        Accepts the same capacity arguments as BaseCaching.
         """
-        super().__init__()
-        self.__fifo = deque([])
+        super().__init__(*args, **kwargs)
+        self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Adds an item to the cache.
 
         Args:
             key: The key of the item.
             item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
         """
         if key is not None and item is not None:
-            # If the key exists in the cache
-            if key in self.cache_data:
-                self.cache_data[key] = item
-                self.__fifo.remove(key)
-                self.__fifo.appendleft(key)
+            weight = self._weigh(item)
+            if weight is None:
                 return
+            # If the key exists in the cache, it is put again as new
+            if key in self.cache_data:
+                self._remove(key)
             # If the key does not exist in the cache
-            self.__fifo.appendleft(key)
-            self.cache_data[key] = item
-            if len(self.cache_data) > self.MAX_ITEMS:
-                removed_key = self.__fifo.pop()
-                del self.cache_data[removed_key]
-                print("DISCARD: {}".format(removed_key))
+            if self._admit(key, item, ttl, weight=weight):
+                self.cache_data[key] = item
+
+    def put_many(self, items, ttl=None):
+        """
+        Adds several items to the cache, in order.
+
+        When nothing watches the evictions (no on_evict, no stats)
+        and there is no max_weight, all the items are stored first and
+        the cache is shrunk back to its capacity in a single eviction
+        pass, which leaves the cache as a sequence of put calls would.
+        Otherwise room is made item by item: a key evicted then put
+        again within the call must be reported, and under a max_weight
+        the keys discarded depend on the weight reached after each item.
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to self.ttl.
+        """
+        cache_data = self.cache_data
+        batch = self.max_weight is None and self.on_evict is None and \
+            self.stats is None
+        for key, item in self._pairs(items):
+            if key is None or item is None:
+                continue
+            weight = self._weigh(item)
+            if weight is None:
+                continue
+            if key in cache_data:
+                self._remove(key)
+            if self._admit(key, item, ttl, make_room=not batch,
+                           weight=weight):
+                cache_data[key] = item
+        if batch:
+            self._shrink()
+
+    def _victim(self):
+        """
+        Returns the first key put in the cache.
+        """
+        return next(iter(self.cache_data))
 
     def get(self, key):
         """
@@ -55,4 +96,22 @@ class FIFOCache(BaseCaching):
             The item associated with the key, or None
                 if the key does not exist in the cache.
         """
+        self._expired(key)
         return self.cache_data.get(key, None)
+
+    def get_many(self, keys):
+        """
+        Retrieves several items from the cache.
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        cache_data, found = self.cache_data, {}
+        for key in keys:
+            item = cache_data.get(key)
+            if item is not None and not self._expired(key):
+                found[key] = item
+        return found
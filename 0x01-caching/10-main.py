@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+
+""" 10-main """
+
+import os
+import tempfile
+
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+path = os.path.join(tempfile.mkdtemp(), "cache.snapshot")
+
+my_cache = LRUCache()
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+print(my_cache.get("A"))
+my_cache.dump(path)
+
+# a blocking load restores the saved order: B is used least recently
+restored = LRUCache()
+restored.load(path)
+print(list(restored.cache_data))
+restored.put("D", "School")
+restored.put("E", "Battery")
+restored.print_cache()
+
+# a background load serves the cache while it reads the snapshot
+warm = LRUCache()
+warm.put("Z", "Live")
+loader = warm.load(path, block=False)
+print(warm.get("Z"))
+loader.join()
+print('get' in vars(warm))
+# the snapshot goes behind Z, which was used since the restart
+print(list(warm.cache_data))
+warm.put("E", "Battery")
+warm.print_cache()
+
+# a policy restores its own state: the frequencies of an LFU cache
+lfu = LFUCache()
+lfu.put("A", "Hello")
+lfu.put("B", "World")
+lfu.get("A")
+lfu.get("A")
+lfu.dump(path)
+lfu = LFUCache()
+lfu.load(path)
+lfu.put("C", "Holberton")
+lfu.put("D", "School")
+lfu.put("E", "Battery")
+lfu.print_cache()
+
+os.remove(path)
+os.rmdir(os.path.dirname(path))
@@ -13,55 +13,169 @@ class LFUCache(BaseCaching):
     """
     LFUCache class that inherits from BaseCaching.
 
-    Implements a Leat Frequently Used (LFU) caching algorithm.
+    Implements a Least Frequently Used (LFU) caching algorithm.
+    When several keys share the lowest frequency, the least
+    recently used one among them is discarded.
+
+    Keys are grouped in frequency buckets: each bucket is an
+    OrderedDict (a doubly linked list under the hood) holding the
+    keys that have been used exactly that many times, ordered from
+    the least to the most recently used. Together with the lowest
+    frequency in use, this makes get, put and eviction O(1).
 
     Attributes:
-        __lfu (OrderedDict): A dictionary that keeps track
-            of the Leat Frequently Used items.
+        __freq (dict): Maps each key to its use frequency.
+        __buckets (dict): Maps a frequency to the OrderedDict of
+            keys having that frequency.
+        __min_freq (int): The lowest frequency currently in use.
 
     Methods:
         put(key, item): Adds an item to the cache.
         get(key): Retrieves an item from the cache.
     """
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """
         Initialize an instance of LFUCache.
+
+        Accepts the same capacity arguments as BaseCaching.
+        """
+        super().__init__(*args, **kwargs)
+        self.__freq = {}
+        self.__buckets = {}
+        self.__min_freq = 1
+
+    def __unlink(self, key):
+        """
+        Takes a key out of its frequency bucket.
+
+        The lowest frequency may be left pointing at a bucket that no
+        longer exists; it never exceeds the real lowest frequency and
+        is repaired when a victim is needed.
+
+        Args:
+            key: The key to unlink.
+
+        Returns:
+            The frequency the key had.
         """
-        super().__init__()
-        self.__lfu = OrderedDict()
+        freq = self.__freq.pop(key)
+        bucket = self.__buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.__buckets[freq]
+            if self.__min_freq == freq:
+                self.__min_freq = freq + 1
+        return freq
 
-    def put(self, key, item):
+    def __link(self, key, freq):
+        """
+        Puts a key at the most recently used end of a frequency bucket.
+
+        Args:
+            key: The key to link.
+            freq: The frequency of the key.
+        """
+        self.__freq[key] = freq
+        bucket = self.__buckets.get(freq)
+        if bucket is None:
+            bucket = self.__buckets[freq] = OrderedDict()
+        bucket[key] = None
+        if freq < self.__min_freq:
+            self.__min_freq = freq
+
+    def put(self, key, item, ttl=None):
         """
         Adds an item to the cache.
 
         Args:
             key: The key of the item.
             item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
 
         Returns:
             None
         """
         if key is not None and item is not None:
-            # If the key exists in the cache
+            weight = self._weigh(item)
+            if weight is None:
+                return
+            # If the key exists in the cache, it keeps its frequency
+            freq = 0
             if key in self.cache_data:
+                freq = self.__freq[key]
+                self._remove(key)
+            if self._admit(key, item, ttl, weight=weight):
                 self.cache_data[key] = item
-                self.__lfu[key] += 1
-                self.__lfu.move_to_end(key, last=True)
-                return
-            # If the key does not exist in the cache
-            if len(self.cache_data) == self.MAX_ITEMS:
-                # find LFU and LRU (if more than one) and remove it
-                lfu_key, lfu_weight = '_', float('+inf')
-                for k in self.__lfu.keys():
-                    w = self.__lfu[k]
-                    if w < lfu_weight:
-                        lfu_key, lfu_weight = k, w
-                del self.cache_data[lfu_key]
-                self.__lfu.pop(lfu_key)
-                print("DISCARD: {}".format(lfu_key))
+                self.__link(key, freq + 1)
+
+    def put_many(self, items, ttl=None):
+        """
+        Adds several items to the cache, in order.
+
+        A new key may discard a key put earlier in the same call,
+        and the least frequently used key depends on the frequencies
+        reached after each item, so room is made item by item.
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to self.ttl.
+        """
+        cache_data, freqs = self.cache_data, self.__freq
+        for key, item in self._pairs(items):
+            if key is None or item is None:
+                continue
+            weight = self._weigh(item)
+            if weight is None:
+                continue
+            freq = 0
+            if key in cache_data:
+                freq = freqs[key]
+                self._remove(key)
+            if self._admit(key, item, ttl, weight=weight):
+                cache_data[key] = item
+                self.__link(key, freq + 1)
+
+    def _snapshot(self):
+        """
+        Yields every key with its frequency, from the least to the
+        most frequently used, least recently used first.
+        """
+        for freq in sorted(self.__buckets):
+            for key in self.__buckets[freq]:
+                yield key, freq
+
+    def _restore(self, key, item, state, ttl):
+        """
+        Stores a key read from a snapshot with its saved frequency,
+        at the least recently used end of its frequency bucket.
+        """
+        if self._admit(key, item, ttl):
             self.cache_data[key] = item
-            self.__lfu[key] = 1
+            self.__link(key, state or 1)
+            self.__buckets[state or 1].move_to_end(key, last=False)
+
+    def _victim(self):
+        """
+        Returns the least recently used key among
+        the least frequently used ones.
+        """
+        if self.__min_freq not in self.__buckets:
+            self.__min_freq = min(self.__buckets)
+        return next(iter(self.__buckets[self.__min_freq]))
+
+    def _remove(self, key):
+        """
+        Removes a key from the cache and its frequency bucket.
+
+        Args:
+            key: The key to remove.
+
+        Returns:
+            The item that was associated with the key.
+        """
+        self.__unlink(key)
+        return super()._remove(key)
 
     def get(self, key):
         """
@@ -74,7 +188,26 @@ class LFUCache(BaseCaching):
             The item associated with the key, or None if the key
                 does not exist in the cache.
         """
-        if key in self.cache_data:
-            self.__lfu[key] += 1
-            self.__lfu.move_to_end(key, last=True)
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or self._expired(key):
+            return None
+        self.__link(key, self.__unlink(key) + 1)
+        return item
+
+    def get_many(self, keys):
+        """
+        Retrieves several items from the cache.
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        cache_data, found = self.cache_data, {}
+        for key in keys:
+            item = cache_data.get(key)
+            if item is not None and not self._expired(key):
+                self.__link(key, self.__unlink(key) + 1)
+                found[key] = item
+        return found
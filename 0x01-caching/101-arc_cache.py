@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+"""
+This module implements an ARCCache
+using the BaseCaching class as its base.
+"""
+
+from base_caching import BaseCaching
+from collections import OrderedDict
+
+
+class ARCCache(BaseCaching):
+    """
+    ARCCache class that inherits from BaseCaching.
+
+    Implements the Adaptive Replacement Cache (ARC) algorithm of
+    Megiddo and Modha. Keys seen once live in T1, keys seen again
+    are promoted to T2. The keys recently evicted from each list are
+    remembered (without their items) in the ghost lists B1 and B2: a
+    miss on a ghost tells which list deserved more room and moves the
+    target size p of T1 accordingly. A scan only goes through T1, so
+    it cannot flush the frequently used keys of T2.
+
+    Attributes:
+        __t1 (OrderedDict): Keys seen once, least recent first.
+        __t2 (OrderedDict): Keys seen more than once, least recent first.
+        __b1 (OrderedDict): Ghost keys evicted from T1.
+        __b2 (OrderedDict): Ghost keys evicted from T2.
+        __p (int): The target size of T1.
+
+    Methods:
+        put(key, item): Adds an item to the cache.
+        get(key): Retrieves an item from the cache.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize an instance of ARCCache.
+
+        Accepts the same capacity arguments as BaseCaching.
+        """
+        super().__init__(*args, **kwargs)
+        self.__t1 = OrderedDict()
+        self.__t2 = OrderedDict()
+        self.__b1 = OrderedDict()
+        self.__b2 = OrderedDict()
+        self.__p = 0
+        self.__from_b2 = False
+
+    def __capacity(self):
+        """
+        Returns the number of items the lists are sized for.
+        """
+        if self.max_items is not None:
+            return self.max_items
+        return len(self.cache_data) + 1
+
+    def put(self, key, item, ttl=None):
+        """
+        Adds an item to the cache.
+
+        A cached key is updated and promoted to T2. A ghost key adapts
+        the target size of T1 and comes back into T2; any other key
+        enters T1.
+
+        Args:
+            key: The key of the item.
+            item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
+
+        Returns:
+            None
+        """
+        if key is None or item is None:
+            return
+        weight = self._weigh(item)
+        if weight is None:
+            return
+        target = self.__t2
+        # If the key exists in the cache, it is put again as new
+        if key in self.cache_data:
+            self._remove(key)
+        elif key in self.__b1:
+            shift = max(len(self.__b2) // len(self.__b1), 1)
+            self.__p = min(self.__capacity(), self.__p + shift)
+            del self.__b1[key]
+        elif key in self.__b2:
+            shift = max(len(self.__b1) // len(self.__b2), 1)
+            self.__p = max(0, self.__p - shift)
+            del self.__b2[key]
+            self.__from_b2 = True
+        else:
+            target = self.__t1
+        admitted = self._admit(key, item, ttl, weight=weight)
+        self.__from_b2 = False
+        if admitted:
+            self.cache_data[key] = item
+            target[key] = None
+            self.__trim_ghosts()
+
+    def __trim_ghosts(self):
+        """
+        Forgets the oldest ghosts beyond the ARC bounds:
+        |T1| + |B1| <= c and |T1| + |T2| + |B1| + |B2| <= 2c.
+        """
+        capacity = self.__capacity()
+        t1, b1, b2 = self.__t1, self.__b1, self.__b2
+        while b1 and len(t1) + len(b1) > capacity:
+            b1.popitem(last=False)
+        while b2 and \
+                len(self.cache_data) + len(b1) + len(b2) > 2 * capacity:
+            b2.popitem(last=False)
+
+    def _snapshot(self):
+        """
+        Yields the keys of T1 then T2, least recent first,
+        with the name of their list.
+        """
+        for key in self.__t1:
+            yield key, 't1'
+        for key in self.__t2:
+            yield key, 't2'
+
+    def _restore(self, key, item, state, ttl):
+        """
+        Stores a key read from a snapshot back in its list,
+        at its least recently used end.
+        """
+        if self._admit(key, item, ttl):
+            self.cache_data[key] = item
+            target = self.__t2 if state == 't2' else self.__t1
+            target[key] = None
+            target.move_to_end(key, last=False)
+            self.__trim_ghosts()
+
+    def _victim(self):
+        """
+        Returns the least recently used key of T1 when T1 is over its
+        target size, otherwise the least recently used key of T2.
+        """
+        t1 = self.__t1
+        if t1 and (not self.__t2 or len(t1) > self.__p or
+                   (self.__from_b2 and len(t1) == self.__p)):
+            return next(iter(t1))
+        return next(iter(self.__t2))
+
+    def _discard(self, key):
+        """
+        Evicts a key and remembers it in the matching ghost list.
+
+        Args:
+            key: The key to evict.
+        """
+        ghosts = self.__b1 if key in self.__t1 else self.__b2
+        super()._discard(key)
+        ghosts[key] = None
+        self.__trim_ghosts()
+
+    def _remove(self, key):
+        """
+        Removes a key from the cache and from T1 or T2.
+
+        Args:
+            key: The key to remove.
+
+        Returns:
+            The item that was associated with the key.
+        """
+        if key in self.__t1:
+            del self.__t1[key]
+        else:
+            del self.__t2[key]
+        return super()._remove(key)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache.
+
+        A key found in T1 is promoted to T2, a key found in T2 becomes
+        its most recently used one.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The item associated with the key, or None if the key
+                does not exist in the cache.
+        """
+        if key in self.cache_data and not self._expired(key):
+            if key in self.__t1:
+                del self.__t1[key]
+                self.__t2[key] = None
+            else:
+                self.__t2.move_to_end(key, last=True)
+        return self.cache_data.get(key, None)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+"""
+This module implements a TinyLFUCache (W-TinyLFU)
+using the BaseCaching class as its base.
+"""
+
+from base_caching import BaseCaching
+from collections import OrderedDict
+
+
+class CountMinSketch():
+    """
+    CountMinSketch estimates how often keys were seen.
+
+    It keeps DEPTH rows of small counters (one byte each, saturating
+    at MAX_COUNT) and answers with the smallest counter of a key, so
+    collisions can only overestimate. Once sample_size keys have been
+    recorded every counter is halved, so that old popularity fades.
+
+    Attributes:
+        table (bytearray): The counters, row after row.
+        sample_size (int): The number of records between two agings.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+             0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    MASK64 = (1 << 64) - 1
+
+    def __init__(self, capacity):
+        """
+        Initialize an instance of CountMinSketch.
+
+        Args:
+            capacity (int): The number of keys the cache holds.
+        """
+        self.__bits = max(4, (max(capacity, 1) - 1).bit_length())
+        self.__width = 1 << self.__bits
+        self.table = bytearray(self.DEPTH * self.__width)
+        self.sample_size = 10 * max(capacity, 1)
+        self.__samples = 0
+
+    def __slots(self, key):
+        """
+        Returns the index of the counter of a key in every row.
+        """
+        h = hash(key) & self.MASK64
+        shift = 64 - self.__bits
+        return [row * self.__width + (((h * seed) & self.MASK64) >> shift)
+                for row, seed in enumerate(self.SEEDS)]
+
+    def increment(self, key):
+        """
+        Records one more sighting of a key.
+
+        Args:
+            key: The key seen.
+        """
+        table = self.table
+        for slot in self.__slots(key):
+            if table[slot] < self.MAX_COUNT:
+                table[slot] += 1
+        self.__samples += 1
+        if self.__samples >= self.sample_size:
+            self.table = bytearray(count >> 1 for count in table)
+            self.__samples //= 2
+
+    def estimate(self, key):
+        """
+        Returns how often a key was seen, at most MAX_COUNT.
+
+        Args:
+            key: The key to look up.
+        """
+        table = self.table
+        return min(table[slot] for slot in self.__slots(key))
+
+
+class TinyLFUCache(BaseCaching):
+    """
+    TinyLFUCache class that inherits from BaseCaching.
+
+    Implements W-TinyLFU: new keys enter a small LRU window (1% of the
+    capacity). The main space is a segmented LRU made of a probation
+    part and a protected part (80% of the main space) for keys read
+    again. When the cache is full, the oldest window key only takes
+    the place of the probation victim if a count-min sketch says it
+    was seen more often, so one-off keys never push out popular ones.
+
+    Attributes:
+        sketch (CountMinSketch): The frequency of recently seen keys.
+        __window (OrderedDict): New keys, least recent first.
+        __probation (OrderedDict): Main keys read once.
+        __protected (OrderedDict): Main keys read again.
+
+    Methods:
+        put(key, item): Adds an item to the cache.
+        get(key): Retrieves an item from the cache.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize an instance of TinyLFUCache.
+
+        Accepts the same capacity arguments as BaseCaching. The sizes
+        of the segments are derived from max_items (MAX_ITEMS when the
+        cache is only bounded by weight).
+        """
+        super().__init__(*args, **kwargs)
+        capacity = self.max_items
+        if capacity is None:
+            capacity = self.MAX_ITEMS
+        self.__window_size = max(1, capacity // 100)
+        self.__protected_size = (capacity - self.__window_size) * 4 // 5
+        self.sketch = CountMinSketch(capacity)
+        self.__window = OrderedDict()
+        self.__probation = OrderedDict()
+        self.__protected = OrderedDict()
+
+    def __segment(self, key):
+        """
+        Returns the segment holding a cached key.
+        """
+        if key in self.__window:
+            return self.__window
+        if key in self.__probation:
+            return self.__probation
+        return self.__protected
+
+    def put(self, key, item, ttl=None):
+        """
+        Adds an item to the cache.
+
+        A new key enters the window; an updated key stays in its
+        segment. When the window grows past its size, its oldest key
+        moves to probation.
+
+        Args:
+            key: The key of the item.
+            item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
+
+        Returns:
+            None
+        """
+        if key is None or item is None:
+            return
+        self.sketch.increment(key)
+        weight = self._weigh(item)
+        if weight is None:
+            return
+        segment = self.__window
+        # If the key exists in the cache, it is put again in its segment
+        if key in self.cache_data:
+            segment = self.__segment(key)
+            self._remove(key)
+        if self._admit(key, item, ttl, weight=weight):
+            self.cache_data[key] = item
+            segment[key] = None
+            window = self.__window
+            if len(window) > self.__window_size:
+                oldest = next(iter(window))
+                del window[oldest]
+                self.__probation[oldest] = None
+
+    def _snapshot(self):
+        """
+        Yields the keys of every segment, least recent first, with
+        their segment and their estimated frequency.
+        """
+        segments = (('probation', self.__probation),
+                    ('protected', self.__protected),
+                    ('window', self.__window))
+        for name, segment in segments:
+            for key in segment:
+                yield key, (name, self.sketch.estimate(key))
+
+    def _restore(self, key, item, state, ttl):
+        """
+        Stores a key read from a snapshot back in its segment, at its
+        least recent end, and warms the sketch up with its saved
+        frequency.
+        """
+        name, freq = state if state is not None else ('window', 1)
+        segment = {'probation': self.__probation,
+                   'protected': self.__protected}.get(name, self.__window)
+        for _ in range(freq):
+            self.sketch.increment(key)
+        if self._admit(key, item, ttl):
+            self.cache_data[key] = item
+            segment[key] = None
+            segment.move_to_end(key, last=False)
+
+    def _victim(self):
+        """
+        Returns the key to evict, settling the admission of the
+        oldest window key against the probation victim.
+
+        The window key wins only if the sketch saw it more often;
+        it then moves to probation and the probation victim goes.
+        """
+        window = self.__window
+        main = self.__probation or self.__protected
+        if not main:
+            return next(iter(window))
+        victim = next(iter(main))
+        if not window:
+            return victim
+        candidate = next(iter(window))
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            del window[candidate]
+            self.__probation[candidate] = None
+            return victim
+        return candidate
+
+    def _remove(self, key):
+        """
+        Removes a key from the cache and its segment.
+
+        Args:
+            key: The key to remove.
+
+        Returns:
+            The item that was associated with the key.
+        """
+        del self.__segment(key)[key]
+        return super()._remove(key)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache.
+
+        A probation key read again is promoted to the protected part,
+        whose oldest key falls back to probation when it is full.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The item associated with the key, or None if the key
+                does not exist in the cache.
+        """
+        self.sketch.increment(key)
+        if key in self.cache_data and not self._expired(key):
+            probation, protected = self.__probation, self.__protected
+            if key in probation:
+                del probation[key]
+                protected[key] = None
+                if len(protected) > self.__protected_size:
+                    oldest = next(iter(protected))
+                    del protected[oldest]
+                    probation[oldest] = None
+            else:
+                self.__segment(key).move_to_end(key, last=True)
+        return self.cache_data.get(key, None)
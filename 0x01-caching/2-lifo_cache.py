@@ -6,45 +6,77 @@ using the BaseCaching class as its base.
 """
 
 from base_caching import BaseCaching
+from collections import OrderedDict
 
 
 class LIFOCache(BaseCaching):
     """
     LIFOCache class that inherits from BaseCaching.
+
+    cache_data is an OrderedDict kept in insertion order, so
+    overwrites, evictions and lookups are all O(1).
     """
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """
         Initialize an instance of LIFOCache.
+
+        Accepts the same capacity arguments as BaseCaching.
         """
-        super().__init__()
-        self.__lifo = []
+        super().__init__(*args, **kwargs)
+        self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item to the cache.
 
         Args:
             key: The key of the item.
             item: The item to be added.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
 
         Returns:
             None
         """
         if key is not None and item is not None:
-            # If the key exists in the cache
-            if key in self.cache_data:
-                self.cache_data[key] = item
-                self.__lifo.remove(key)
-                self.__lifo.append(key)
+            weight = self._weigh(item)
+            if weight is None:
                 return
+            # If the key exists in the cache, it is put again as new
+            if key in self.cache_data:
+                self._remove(key)
             # If the key does not exist in the cache
-            self.cache_data[key] = item
-            if len(self.cache_data) > self.MAX_ITEMS:
-                removed_key = self.__lifo.pop()
-                del self.cache_data[removed_key]
-                print("DISCARD: {}".format(removed_key))
-            self.__lifo.append(key)
+            if self._admit(key, item, ttl, weight=weight):
+                self.cache_data[key] = item
+
+    def put_many(self, items, ttl=None):
+        """
+        Adds several items to the cache, in order.
+
+        Each new key may discard the one put just before it,
+        so room is made item by item within a single loop.
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to self.ttl.
+        """
+        cache_data = self.cache_data
+        for key, item in self._pairs(items):
+            if key is None or item is None:
+                continue
+            weight = self._weigh(item)
+            if weight is None:
+                continue
+            if key in cache_data:
+                self._remove(key)
+            if self._admit(key, item, ttl, weight=weight):
+                cache_data[key] = item
+
+    def _victim(self):
+        """
+        Returns the last key put in the cache.
+        """
+        return next(reversed(self.cache_data))
 
     def get(self, key):
         """
@@ -57,4 +89,22 @@ class LIFOCache(BaseCaching):
             The item associated with the key, or None
                 if the key does not exist in the cache.
         """
+        self._expired(key)
         return self.cache_data.get(key, None)
+
+    def get_many(self, keys):
+        """
+        Retrieves several items from the cache.
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        cache_data, found = self.cache_data, {}
+        for key in keys:
+            item = cache_data.get(key)
+            if item is not None and not self._expired(key):
+                found[key] = item
+        return found
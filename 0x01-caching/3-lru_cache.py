@@ -16,59 +16,97 @@ class LRUCache(BaseCaching):
     Implements a Least Recently Used (LRU) caching algorithm.
 
     Attributes:
-        __lru (OrderedDict): A dictionary that keeps track
-            of the least recently used items.
+        cache_data (OrderedDict): The items, ordered from the least
+            to the most recently used.
 
     Methods:
         put(key, item): Adds an item to the cache.
         get(key): Retrieves an item from the cache.
     """
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """
-        Initialize an instance of LIFOCache.
+        Initialize an instance of LRUCache.
+
+        Accepts the same capacity arguments as BaseCaching.
         """
-        super().__init__()
-        self.__lru = OrderedDict()
+        super().__init__(*args, **kwargs)
+        self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Adds an item to the cache.
 
         If the key already exists in the cache, the item is updated
-        and moved to the end of the LRU list.
+        and moved to the end of the cache.
         If the key does not exist in the cache and the cache is full,
         the least recently used item is removed.
-        The new item is then added to the cache and the LRU list.
+        The new item is then added at the end of the cache.
 
         Args:
             key: The key of the item.
             item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
 
         Returns:
             None
         """
         if key is not None and item is not None:
-            # If the key exists in the cache
-            if key in self.cache_data:
-                self.cache_data[key] = item
-                self.__lru[key] = item
-                self.__lru.move_to_end(key, last=True)
+            weight = self._weigh(item)
+            if weight is None:
                 return
+            # If the key exists in the cache, it is put again as new
+            if key in self.cache_data:
+                self._remove(key)
             # If the key does not exist in the cache
-            if len(self.cache_data) == self.MAX_ITEMS:
-                del_key, _ = self.__lru.popitem(last=False)
-                print("DISCARD: {}".format(del_key))
-                del self.cache_data[del_key]
-            self.cache_data[key] = item
-            self.__lru[key] = item
+            if self._admit(key, item, ttl, weight=weight):
+                self.cache_data[key] = item
+
+    def put_many(self, items, ttl=None):
+        """
+        Adds several items to the cache, in order.
+
+        When nothing watches the evictions (no on_evict, no stats)
+        and there is no max_weight, all the items are stored first and
+        the cache is shrunk back to its capacity in a single eviction
+        pass, which leaves the cache as a sequence of put calls would.
+        Otherwise room is made item by item: a key evicted then put
+        again within the call must be reported, and under a max_weight
+        the keys discarded depend on the weight reached after each item.
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to self.ttl.
+        """
+        cache_data = self.cache_data
+        batch = self.max_weight is None and self.on_evict is None and \
+            self.stats is None
+        for key, item in self._pairs(items):
+            if key is None or item is None:
+                continue
+            weight = self._weigh(item)
+            if weight is None:
+                continue
+            if key in cache_data:
+                self._remove(key)
+            if self._admit(key, item, ttl, make_room=not batch,
+                           weight=weight):
+                cache_data[key] = item
+        if batch:
+            self._shrink()
+
+    def _victim(self):
+        """
+        Returns the least recently used key.
+        """
+        return next(iter(self.cache_data))
 
     def get(self, key):
         """
         Retrieves an item from the cache.
 
         If the key exists in the cache, the item is moved
-        to the end of the LRU list.
+        to the end of the cache.
         If the key does not exist in the cache, None is returned.
 
         Args:
@@ -78,6 +116,29 @@ class LRUCache(BaseCaching):
             The item associated with the key, or None if the key
                 does not exist in the cache.
         """
-        if key in self.cache_data:
-            self.__lru.move_to_end(key, last=True)
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or self._expired(key):
+            return None
+        self.cache_data.move_to_end(key, last=True)
+        return item
+
+    def get_many(self, keys):
+        """
+        Retrieves several items from the cache.
+
+        Every item found is moved to the end of the cache,
+        in the order of the keys.
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        cache_data, found = self.cache_data, {}
+        for key in keys:
+            item = cache_data.get(key)
+            if item is not None and not self._expired(key):
+                cache_data.move_to_end(key, last=True)
+                found[key] = item
+        return found
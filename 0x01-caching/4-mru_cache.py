@@ -16,59 +16,87 @@ class MRUCache(BaseCaching):
     Implements a Most Recently Used (MRU) caching algorithm.
 
     Attributes:
-        __mru (OrderedDict): A dictionary that keeps track
-            of the most recently used items.
+        cache_data (OrderedDict): The items, ordered from the least
+            to the most recently used.
 
     Methods:
         put(key, item): Adds an item to the cache.
         get(key): Retrieves an item from the cache.
     """
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """
         Initialize an instance of MRUCache.
+
+        Accepts the same capacity arguments as BaseCaching.
         """
-        super().__init__()
-        self.__mru = OrderedDict()
+        super().__init__(*args, **kwargs)
+        self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Adds an item to the cache.
 
         If the key already exists in the cache, the item is updated
-        and moved to the end of the MRU list.
+        and moved to the end of the cache.
         If the key does not exist in the cache and the cache is full,
         the most recently used item is removed.
-        The new item is then added to the cache and the MRU list.
+        The new item is then added at the end of the cache.
 
         Args:
             key: The key of the item.
             item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
 
         Returns:
             None
         """
         if key is not None and item is not None:
-            # If the key exists in the cache
-            if key in self.cache_data:
-                self.cache_data[key] = item
-                self.__mru[key] = item
-                self.__mru.move_to_end(key, last=True)
+            weight = self._weigh(item)
+            if weight is None:
                 return
+            # If the key exists in the cache, it is put again as new
+            if key in self.cache_data:
+                self._remove(key)
             # If the key does not exist in the cache
-            if len(self.cache_data) == self.MAX_ITEMS:
-                del_key, _ = self.__mru.popitem(last=True)
-                print("DISCARD: {}".format(del_key))
-                del self.cache_data[del_key]
-            self.cache_data[key] = item
-            self.__mru[key] = item
+            if self._admit(key, item, ttl, weight=weight):
+                self.cache_data[key] = item
+
+    def put_many(self, items, ttl=None):
+        """
+        Adds several items to the cache, in order.
+
+        Each new key may discard the one put just before it,
+        so room is made item by item within a single loop.
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to self.ttl.
+        """
+        cache_data = self.cache_data
+        for key, item in self._pairs(items):
+            if key is None or item is None:
+                continue
+            weight = self._weigh(item)
+            if weight is None:
+                continue
+            if key in cache_data:
+                self._remove(key)
+            if self._admit(key, item, ttl, weight=weight):
+                cache_data[key] = item
+
+    def _victim(self):
+        """
+        Returns the most recently used key.
+        """
+        return next(reversed(self.cache_data))
 
     def get(self, key):
         """
         Retrieves an item from the cache.
 
         If the key exists in the cache, the item is moved
-        to the end of the MRU list.
+        to the end of the cache.
         If the key does not exist in the cache, None is returned.
 
         Args:
@@ -78,6 +106,29 @@ class MRUCache(BaseCaching):
             The item associated with the key, or None if the key
                 does not exist in the cache.
         """
-        if key in self.cache_data:
-            self.__mru.move_to_end(key, last=True)
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or self._expired(key):
+            return None
+        self.cache_data.move_to_end(key, last=True)
+        return item
+
+    def get_many(self, keys):
+        """
+        Retrieves several items from the cache.
+
+        Every item found is moved to the end of the cache,
+        in the order of the keys.
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        cache_data, found = self.cache_data, {}
+        for key in keys:
+            item = cache_data.get(key)
+            if item is not None and not self._expired(key):
+                cache_data.move_to_end(key, last=True)
+                found[key] = item
+        return found
@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+
+""" 5-main """
+
+from threading import Thread
+
+ShardedCache = __import__('5-sharded_cache').ShardedCache
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+def worker(cache, start):
+    """ put then get a range of keys """
+    for i in range(start, start + 100):
+        cache.put("K{:03d}".format(i), i)
+        cache.get("K{:03d}".format(i))
+
+
+my_cache = ShardedCache(LRUCache, shards=4, max_items=8)
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.print_cache()
+print(my_cache.get("A"))
+print(my_cache.get("Z"))
+
+my_cache = ShardedCache(LRUCache, shards=8, max_items=4096)
+threads = [Thread(target=worker, args=(my_cache, n * 100)) for n in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(len(my_cache.cache_data))
+print(my_cache.get("K042"))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+"""
+This module implements a thread-safe ShardedCache that splits
+its keys across several independent caching policy instances.
+"""
+
+from threading import Lock
+
+
+class ShardedCache():
+    """
+    ShardedCache wraps any BaseCaching policy to make it thread-safe.
+
+    The key space is split across several shards, each one being an
+    independent instance of the policy guarded by its own lock, so
+    threads working on different shards never wait for each other.
+    Eviction is decided per shard: each shard applies the policy to
+    its own share of the capacity.
+
+    Attributes:
+        shards (list): The (lock, cache) pair of every shard.
+
+    Methods:
+        put(key, item): Adds an item to the cache.
+        get(key): Retrieves an item from the cache.
+        print_cache(): Prints the content of every shard.
+        get_many(keys): Retrieves several items from the cache.
+        put_many(items): Adds several items to the cache.
+        expire(): Removes the expired items of every shard.
+    """
+
+    def __init__(self, policy, shards=16, max_items=None, max_weight=None,
+                 **kwargs):
+        """
+        Initialize an instance of ShardedCache.
+
+        Args:
+            policy: The BaseCaching subclass used by every shard.
+            shards: The number of shards.
+            max_items: The total maximum number of items, split as
+                evenly as possible between the shards. Defaults to the
+                policy MAX_ITEMS, or to no limit when only max_weight
+                is given.
+            max_weight: The total maximum weight, split the same way.
+            kwargs: Other arguments given to every policy instance.
+
+        The capacities of the shards add up to max_items and
+        max_weight exactly, so there are never more shards than either
+        of them.
+        """
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+        if max_items is None and max_weight is None:
+            max_items = policy.MAX_ITEMS
+        for total in (max_items, max_weight):
+            if total is not None:
+                shards = min(shards, max(total, 1))
+        self.shards = []
+        for index in range(shards):
+            if max_items is not None:
+                kwargs['max_items'] = self.__share(max_items, shards, index)
+            if max_weight is not None:
+                kwargs['max_weight'] = self.__share(max_weight, shards,
+                                                    index)
+            self.shards.append((Lock(), policy(**kwargs)))
+
+    @staticmethod
+    def __share(total, shards, index):
+        """
+        Returns the part of a total capacity given to a shard.
+        """
+        share, extra = divmod(total, shards)
+        return share + (index < extra)
+
+    def _shard(self, key):
+        """
+        Returns the (lock, cache) pair in charge of a key.
+        """
+        return self.shards[hash(key) % len(self.shards)]
+
+    @property
+    def cache_data(self):
+        """
+        A copy of the items held by all the shards.
+        """
+        data = {}
+        for lock, cache in self.shards:
+            with lock:
+                data.update(cache.cache_data)
+        return data
+
+    def print_cache(self):
+        """
+        Prints the content of the cache.
+        """
+        data = self.cache_data
+        print("Current cache:")
+        for key in sorted(data.keys()):
+            print("{}: {}".format(key, data.get(key)))
+
+    def put(self, key, item, ttl=None):
+        """
+        Adds an item to the cache.
+
+        Args:
+            key: The key of the item.
+            item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to the policy ttl.
+
+        Returns:
+            None
+        """
+        if key is not None and item is not None:
+            lock, cache = self._shard(key)
+            with lock:
+                cache.put(key, item, ttl)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The item associated with the key, or None if the key
+                does not exist in the cache.
+        """
+        if key is None:
+            return None
+        lock, cache = self._shard(key)
+        with lock:
+            return cache.get(key)
+
+    def _split(self, entries, pairs=False):
+        """
+        Groups keys, or (key, item) pairs, by shard index.
+        """
+        groups = {}
+        count = len(self.shards)
+        for entry in entries:
+            key = entry[0] if pairs else entry
+            groups.setdefault(hash(key) % count, []).append(entry)
+        return groups
+
+    def get_many(self, keys):
+        """
+        Retrieves several items, taking each shard lock only once.
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        found = {}
+        for index, group in self._split(keys).items():
+            lock, cache = self.shards[index]
+            with lock:
+                found.update(cache.get_many(group))
+        return found
+
+    def put_many(self, items, ttl=None):
+        """
+        Adds several items, taking each shard lock only once.
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to the policy ttl.
+        """
+        if hasattr(items, 'items'):
+            items = items.items()
+        for index, group in self._split(items, pairs=True).items():
+            lock, cache = self.shards[index]
+            with lock:
+                cache.put_many(group, ttl)
+
+    def expire(self):
+        """
+        Removes the expired items of every shard.
+
+        Returns:
+            The number of items removed.
+        """
+        removed = 0
+        for lock, cache in self.shards:
+            with lock:
+                removed += cache.expire()
+        return removed
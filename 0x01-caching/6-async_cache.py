@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+This module implements an AsyncCache facade that lets coroutines
+share any BaseCaching policy and coalesces concurrent misses.
+"""
+
+import asyncio
+import inspect
+
+
+class AsyncCache():
+    """
+    AsyncCache wraps a BaseCaching policy for asyncio code.
+
+    When several coroutines miss the same key at once, only the first
+    one runs the loader; the others wait for its result instead of
+    computing it again. The loaded item is then put in the policy,
+    which decides what to evict as usual.
+
+    Attributes:
+        cache: The wrapped BaseCaching instance.
+
+    Methods:
+        put(key, item): Adds an item to the cache.
+        get(key): Retrieves an item from the cache.
+        get_or_load(key, loader): Retrieves or loads an item.
+    """
+
+    def __init__(self, cache):
+        """
+        Initialize an instance of AsyncCache.
+
+        Args:
+            cache: The BaseCaching instance holding the items.
+        """
+        self.cache = cache
+        self.__loading = {}
+
+    async def put(self, key, item, ttl=None):
+        """
+        Adds an item to the cache.
+
+        Args:
+            key: The key of the item.
+            item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to the cache ttl.
+        """
+        self.cache.put(key, item, ttl)
+
+    async def get(self, key):
+        """
+        Retrieves an item from the cache.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The item associated with the key, or None if the key
+                does not exist in the cache.
+        """
+        return self.cache.get(key)
+
+    async def get_or_load(self, key, loader, ttl=None):
+        """
+        Retrieves an item, loading it on a miss.
+
+        Concurrent misses on the same key share a single call to
+        the loader. If the loader raises, every waiter gets the error
+        and nothing is cached.
+
+        Args:
+            key: The key of the item to retrieve.
+            loader: A callable taking the key and returning the item,
+                or an awaitable resolving to it.
+            ttl: The time-to-live of a loaded item, in seconds.
+
+        Returns:
+            The cached or loaded item.
+        """
+        item = self.cache.get(key)
+        if item is not None:
+            return item
+        future = self.__loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.__load(key, loader, ttl))
+            self.__loading[key] = future
+        # a cancelled waiter must not cancel the load of the others
+        return await asyncio.shield(future)
+
+    async def __load(self, key, loader, ttl):
+        """
+        Runs a loader and caches its result.
+        """
+        try:
+            item = loader(key)
+            if inspect.isawaitable(item):
+                item = await item
+            self.cache.put(key, item, ttl)
+            return item
+        finally:
+            del self.__loading[key]
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+
+""" 6-main """
+
+import asyncio
+
+AsyncCache = __import__('6-async_cache').AsyncCache
+LRUCache = __import__('3-lru_cache').LRUCache
+
+calls = []
+
+
+async def slow_square(key):
+    """ a slow loader counting its calls """
+    calls.append(key)
+    await asyncio.sleep(0.1)
+    return key * key
+
+
+async def main():
+    """ many coroutines missing the same keys at once """
+    my_cache = AsyncCache(LRUCache())
+    results = await asyncio.gather(
+        *(my_cache.get_or_load(n % 2 + 2, slow_square) for n in range(50)))
+    print(sorted(set(results)))
+    print(sorted(calls))
+    print(await my_cache.get(3))
+    my_cache.cache.print_cache()
+
+asyncio.run(main())
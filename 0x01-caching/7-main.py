@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+
+""" 7-main """
+
+import os
+import tempfile
+from multiprocessing import Process
+
+SharedCache = __import__('7-shared_cache').SharedCache
+
+PATH = os.path.join(tempfile.gettempdir(), '7-main.cache')
+
+
+def worker(name):
+    """ a worker process opening the same cache """
+    my_cache = SharedCache(PATH, max_items=4)
+    my_cache.put(name, "from {}".format(name))
+    my_cache.close()
+
+
+if os.path.exists(PATH):
+    os.remove(PATH)
+my_cache = SharedCache(PATH, max_items=4)
+my_cache.put("A", "Hello")
+workers = [Process(target=worker, args=(name,)) for name in "BCD"]
+for process in workers:
+    process.start()
+for process in workers:
+    process.join()
+my_cache.print_cache()
+print(my_cache.get("A"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+print(my_cache.get("Z"))
+my_cache.close()
+os.remove(PATH)
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+
+"""
+This module implements a SharedCache whose items live in a
+memory-mapped file shared by every process of a host.
+"""
+
+import fcntl
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import zlib
+from base_caching import BaseCaching
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from threading import RLock
+from time import time
+
+
+class SharedStore(MutableMapping):
+    """
+    SharedStore is a dictionary-like store kept in a shared file.
+
+    The file holds a header, an open addressing index of int32 slot
+    numbers and a fixed number of fixed-size slots. Keys and items are
+    pickled into the slots, so any picklable key and item can be used
+    as long as both fit in a slot. Keys are matched on their pickled
+    form. Every process mapping the same file sees the same entries.
+
+    The store itself does not lock: callers wrap their operations in
+    lock(), which excludes other threads and other processes.
+
+    Layout:
+        header: magic, slots, slot_size, index_size, clock hand,
+            count, first free slot, tombstones
+        index: index_size int32, EMPTY, TOMBSTONE or a slot number
+        slots: used flag, referenced bit, key length, item length,
+            deadline (0 for none), then the key and item bytes
+    """
+
+    MAGIC = b'ALXCACHE'
+    HEADER = struct.Struct('<8sIIIIIiI')
+    HEADER_SIZE = 64
+    SLOT = struct.Struct('<BBHId')
+    EMPTY = -1
+    TOMBSTONE = -2
+
+    def __init__(self, path, slots, slot_size):
+        """
+        Opens the store file, creating it when needed.
+
+        Args:
+            path (str): The file shared by the processes.
+            slots (int): The number of slots.
+            slot_size (int): The size of a slot in bytes.
+        """
+        self.path = path
+        self.__thread_lock = RLock()
+        self.__depth = 0
+        self.__pid = os.getpid()
+        self.__fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self.__fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self.__fd, self.HEADER.size, 0)
+            if header[:8] == self.MAGIC:
+                _, slots, slot_size, index_size = \
+                    self.HEADER.unpack(header)[:4]
+            else:
+                index_size = 1 << max(3, (2 * slots - 1).bit_length())
+                os.ftruncate(self.__fd, self.HEADER_SIZE +
+                             4 * index_size + slots * slot_size)
+            self.slots, self.slot_size = slots, slot_size
+            self.index_size = index_size
+            self.__mm = mmap.mmap(self.__fd, 0)
+            self.__index = memoryview(self.__mm)[
+                self.HEADER_SIZE:self.HEADER_SIZE + 4 * index_size
+            ].cast('i')
+            self.__base = self.HEADER_SIZE + 4 * index_size
+            if header[:8] != self.MAGIC:
+                self.__format()
+        finally:
+            fcntl.flock(self.__fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """
+        Unmaps the file; the entries stay for the other processes.
+        """
+        self.__index.release()
+        self.__mm.close()
+        os.close(self.__fd)
+
+    @contextmanager
+    def lock(self):
+        """
+        Holds the store for the calling thread and process.
+
+        flock locks belong to the open file description, which a forked
+        child shares with its parent, so a child first reopens the file
+        to get a lock of its own.
+        """
+        if self.__pid != os.getpid():
+            self.__reopen()
+        with self.__thread_lock:
+            if self.__depth == 0:
+                fcntl.flock(self.__fd, fcntl.LOCK_EX)
+            self.__depth += 1
+            try:
+                yield self
+            finally:
+                self.__depth -= 1
+                if self.__depth == 0:
+                    fcntl.flock(self.__fd, fcntl.LOCK_UN)
+
+    def __reopen(self):
+        """
+        Gives a forked process its own descriptor and thread lock; the
+        mapping itself is shared and stays valid.
+        """
+        fd = os.open(self.path, os.O_RDWR)
+        os.close(self.__fd)
+        self.__fd = fd
+        self.__thread_lock = RLock()
+        self.__depth = 0
+        self.__pid = os.getpid()
+
+    def __format(self):
+        """
+        Empties the index and chains every slot in the free list.
+        """
+        for pos in range(self.index_size):
+            self.__index[pos] = self.EMPTY
+        for slot in range(self.slots):
+            following = slot + 1 if slot + 1 < self.slots else self.EMPTY
+            self.__write_slot(slot, 0, 0, 0, following & 0xFFFFFFFF, 0)
+        self.__header(hand=0, count=0, free=0 if self.slots else -1,
+                      tombstones=0)
+
+    def __header(self, **fields):
+        """
+        Reads the header, updating the given fields first.
+        """
+        values = list(self.HEADER.unpack_from(self.__mm, 0))
+        names = ('magic', 'slots', 'slot_size', 'index_size',
+                 'hand', 'count', 'free', 'tombstones')
+        current = dict(zip(names, values))
+        if fields or current['magic'] != self.MAGIC:
+            current.update(fields, magic=self.MAGIC, slots=self.slots,
+                           slot_size=self.slot_size,
+                           index_size=self.index_size)
+            self.HEADER.pack_into(self.__mm, 0,
+                                  *(current[name] for name in names))
+        return current
+
+    def __offset(self, slot):
+        """
+        Returns where a slot starts in the file.
+        """
+        return self.__base + slot * self.slot_size
+
+    def __write_slot(self, slot, used, ref, key_len, value_len, deadline,
+                     payload=b''):
+        """
+        Writes the header and the payload of a slot.
+        """
+        offset = self.__offset(slot)
+        self.SLOT.pack_into(self.__mm, offset, used, ref, key_len,
+                            value_len, deadline)
+        if payload:
+            start = offset + self.SLOT.size
+            self.__mm[start:start + len(payload)] = payload
+
+    def __read_slot(self, slot):
+        """
+        Returns the header fields of a slot.
+        """
+        return self.SLOT.unpack_from(self.__mm, self.__offset(slot))
+
+    def __key_bytes(self, slot, key_len):
+        """
+        Returns the pickled key held by a slot.
+        """
+        start = self.__offset(slot) + self.SLOT.size
+        return self.__mm[start:start + key_len]
+
+    def __find(self, key_bytes):
+        """
+        Looks a pickled key up in the index.
+
+        Returns:
+            tuple: The index position and slot of the key (slot None
+                when missing, the position being then where to insert).
+        """
+        mask = self.index_size - 1
+        pos = zlib.crc32(key_bytes) & mask
+        free_pos = None
+        while True:
+            slot = self.__index[pos]
+            if slot == self.EMPTY:
+                return (pos if free_pos is None else free_pos), None
+            if slot == self.TOMBSTONE:
+                if free_pos is None:
+                    free_pos = pos
+            else:
+                key_len = self.__read_slot(slot)[2]
+                if key_len == len(key_bytes) and \
+                        self.__key_bytes(slot, key_len) == key_bytes:
+                    return pos, slot
+            pos = (pos + 1) & mask
+
+    @staticmethod
+    def __dumps(obj):
+        """
+        Pickles a key or an item.
+        """
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def fits(self, key, item):
+        """
+        Tells whether a key and its item fit in a slot.
+        """
+        size = len(self.__dumps(key)) + len(self.__dumps(item))
+        return size <= self.slot_size - self.SLOT.size
+
+    def __getitem__(self, key):
+        """
+        Returns the item of a key.
+        """
+        slot = self.__find(self.__dumps(key))[1]
+        if slot is None:
+            raise KeyError(key)
+        _, _, key_len, value_len, _ = self.__read_slot(slot)
+        start = self.__offset(slot) + self.SLOT.size + key_len
+        return pickle.loads(self.__mm[start:start + value_len])
+
+    def __setitem__(self, key, item):
+        """
+        Stores an item with no deadline.
+        """
+        self.set(key, item)
+
+    def set(self, key, item, deadline=0.0):
+        """
+        Stores an item, in a free slot for a new key.
+
+        Args:
+            key: The key of the item.
+            item: The item.
+            deadline (float): When the item expires (time.time()),
+                0 for never.
+        """
+        key_bytes, value_bytes = self.__dumps(key), self.__dumps(item)
+        if len(key_bytes) + len(value_bytes) > \
+                self.slot_size - self.SLOT.size:
+            raise ValueError("key and item do not fit in a slot")
+        pos, slot = self.__find(key_bytes)
+        header = self.__header()
+        if slot is None:
+            slot = header['free']
+            if slot == self.EMPTY:
+                raise MemoryError("no free slot left")
+            following = self.__read_slot(slot)[3]
+            if following == 0xFFFFFFFF:
+                following = self.EMPTY
+            if self.__index[pos] == self.TOMBSTONE:
+                header['tombstones'] -= 1
+            self.__index[pos] = slot
+            self.__header(free=following, count=header['count'] + 1,
+                          tombstones=header['tombstones'])
+        self.__write_slot(slot, 1, 1, len(key_bytes), len(value_bytes),
+                          deadline, key_bytes + value_bytes)
+
+    def __delitem__(self, key):
+        """
+        Frees the slot of a key.
+        """
+        pos, slot = self.__find(self.__dumps(key))
+        if slot is None:
+            raise KeyError(key)
+        header = self.__header()
+        self.__index[pos] = self.TOMBSTONE
+        self.__write_slot(slot, 0, 0, 0, header['free'] & 0xFFFFFFFF, 0)
+        header = self.__header(free=slot, count=header['count'] - 1,
+                               tombstones=header['tombstones'] + 1)
+        if header['tombstones'] > self.index_size // 4:
+            self.__reindex()
+
+    def __reindex(self):
+        """
+        Rebuilds the index without its tombstones.
+        """
+        for pos in range(self.index_size):
+            self.__index[pos] = self.EMPTY
+        for slot in range(self.slots):
+            used, _, key_len, _, _ = self.__read_slot(slot)
+            if used:
+                pos = self.__find(self.__key_bytes(slot, key_len))[0]
+                self.__index[pos] = slot
+        self.__header(tombstones=0)
+
+    def __iter__(self):
+        """
+        Yields the keys of the used slots.
+        """
+        for slot in range(self.slots):
+            used, _, key_len, _, _ = self.__read_slot(slot)
+            if used:
+                yield pickle.loads(self.__key_bytes(slot, key_len))
+
+    def __len__(self):
+        """
+        Returns the number of entries.
+        """
+        return self.__header()['count']
+
+    def __contains__(self, key):
+        """
+        Tells whether a key is stored.
+        """
+        return self.__find(self.__dumps(key))[1] is not None
+
+    def deadline(self, key):
+        """
+        Returns when a stored key expires, 0 for never.
+        """
+        slot = self.__find(self.__dumps(key))[1]
+        return self.__read_slot(slot)[4] if slot is not None else 0.0
+
+    def touch(self, key):
+        """
+        Sets the referenced bit of a stored key.
+        """
+        slot = self.__find(self.__dumps(key))[1]
+        if slot is not None:
+            self.__mm[self.__offset(slot) + 1] = 1
+
+    def victim(self):
+        """
+        Returns the next key of the CLOCK: the hand clears referenced
+        bits until it finds a used slot that was not referenced.
+        """
+        hand = self.__header()['hand']
+        while True:
+            used, ref, key_len, _, _ = self.__read_slot(hand)
+            if used and not ref:
+                self.__header(hand=(hand + 1) % self.slots)
+                return pickle.loads(self.__key_bytes(hand, key_len))
+            if used:
+                self.__mm[self.__offset(hand) + 1] = 0
+            hand = (hand + 1) % self.slots
+
+    def expired(self, now):
+        """
+        Returns the keys whose deadline is over.
+
+        Args:
+            now (float): The current time.time().
+        """
+        keys = []
+        for slot in range(self.slots):
+            used, _, key_len, _, deadline = self.__read_slot(slot)
+            if used and deadline and deadline <= now:
+                keys.append(pickle.loads(self.__key_bytes(slot, key_len)))
+        return keys
+
+
+class SharedCache(BaseCaching):
+    """
+    SharedCache class that inherits from BaseCaching.
+
+    Its items live in a SharedStore, so every process of the host
+    that opens the same path reads and writes a single cache, for
+    instance all the workers of a pre-fork server. The capacity is the
+    number of slots and eviction follows the CLOCK approximation of
+    LRU, which only needs one shared bit per slot. Time-to-live
+    deadlines are kept in the slots and shared too.
+
+    Attributes:
+        cache_data (SharedStore): The shared items.
+
+    Methods:
+        put(key, item): Adds an item to the cache.
+        get(key): Retrieves an item from the cache.
+        close(): Unmaps the shared file.
+    """
+
+    def __init__(self, path=None, max_items=None, slot_size=1024,
+                 **kwargs):
+        """
+        Initialize an instance of SharedCache.
+
+        Args:
+            path (str): The shared file, default_path() by default.
+                Processes using the same path share the cache; an
+                existing file keeps the sizes it was created with.
+            max_items (int): The number of slots, defaults to MAX_ITEMS.
+            slot_size (int): The size in bytes of a slot, which bounds
+                the pickled size of a key and its item.
+            kwargs: Other BaseCaching arguments; max_weight is not
+                supported since slots already bound the size.
+        """
+        if kwargs.get('max_weight') is not None:
+            raise ValueError("SharedCache is bounded by its slots only")
+        super().__init__(max_items=max_items, **kwargs)
+        if path is None:
+            path = self.default_path()
+        self.cache_data = SharedStore(path, self.max_items, slot_size)
+        self.max_items = self.cache_data.slots
+        self.__deadline = 0.0
+
+    @staticmethod
+    def default_path():
+        """
+        Returns the shared file used when no path is given: one per
+        user and main script, in /dev/shm when it exists, so that the
+        workers of a program share it but unrelated programs do not.
+        """
+        folder = '/dev/shm' if os.path.isdir('/dev/shm') \
+            else tempfile.gettempdir()
+        main = os.path.abspath(sys.argv[0]) if sys.argv and sys.argv[0] \
+            else 'python'
+        name = 'alx_shared_cache.{}.{:08x}'.format(
+            os.getuid(), zlib.crc32(main.encode()))
+        return os.path.join(folder, name)
+
+    def close(self):
+        """
+        Unmaps the shared file of this process.
+        """
+        self.cache_data.close()
+
+    def print_cache(self):
+        """
+        Print the cache
+        """
+        with self.cache_data.lock():
+            super().print_cache()
+
+    def put(self, key, item, ttl=None):
+        """
+        Adds an item to the cache.
+
+        Items whose pickled form does not fit in a slot are ignored.
+
+        Args:
+            key: The key of the item.
+            item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
+
+        Returns:
+            None
+        """
+        if key is None or item is None:
+            return
+        store = self.cache_data
+        weight = self._weigh(item)
+        if weight is None or not store.fits(key, item):
+            return
+        with store.lock():
+            # If the key exists in the cache, it is put again as new
+            if key in store:
+                self._remove(key)
+            if self._admit(key, item, ttl, weight=weight):
+                store.set(key, item, self.__deadline)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The item associated with the key, or None if the key
+                does not exist in the cache.
+        """
+        if key is None:
+            return None
+        store = self.cache_data
+        with store.lock():
+            if key not in store or self._expired(key):
+                return None
+            store.touch(key)
+            return store[key]
+
+    def expire(self):
+        """
+        Removes every expired item.
+
+        Returns:
+            The number of items removed.
+        """
+        store = self.cache_data
+        with store.lock():
+            keys = store.expired(time())
+            for key in keys:
+                self._remove(key)
+        if self.stats is not None:
+            self.stats.expirations += len(keys)
+        return len(keys)
+
+    def _victim(self):
+        """
+        Returns the key the CLOCK hand stops on.
+        """
+        return self.cache_data.victim()
+
+    def _schedule(self, key, ttl=None):
+        """
+        Remembers the deadline stored with the key being put.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        self.__deadline = time() + ttl if ttl is not None else 0.0
+
+    def _expired(self, key):
+        """
+        Removes a key if its shared deadline is over.
+
+        Returns:
+            True if the key has just been removed.
+        """
+        deadline = self.cache_data.deadline(key)
+        if deadline and deadline <= time():
+            self._remove(key)
+            if self.stats is not None:
+                self.stats.expirations += 1
+            return True
+        return False
@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+
+""" 8-main """
+
+memoize = __import__('8-memoize').memoize
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+
+@memoize(LRUCache, max_items=100, stats=True)
+def fibonacci(n):
+    """ naive fibonacci, made linear by the cache """
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+@memoize(LFUCache, max_items=2)
+def greet(name, punctuation="!"):
+    """ prints when it is really called """
+    print("computing {}".format(name))
+    return "Hello {}{}".format(name, punctuation)
+
+
+print(fibonacci(80))
+stats = fibonacci.cache.stats.snapshot()
+print(stats['hits'], stats['misses'])
+print(greet("Holberton"))
+print(greet("Holberton"))
+print(greet("School", punctuation="?"))
+print(greet("Holberton"))
+fibonacci.cache_clear()
+print(len(fibonacci.cache.cache_data))
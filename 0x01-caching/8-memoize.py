@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+"""
+This module provides a memoize decorator factory that caches
+function results in any BaseCaching policy.
+"""
+
+import zlib
+from functools import wraps
+from inspect import Parameter, signature
+
+
+class _Marker:
+    """
+    A unique object that unpickles as itself, so that it survives
+    being stored in a SharedCache.
+    """
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        """ Names the module global holding the marker """
+        self.name = name
+
+    def __reduce__(self):
+        """ Pickles the marker as a reference to its module global """
+        return self.name
+
+    def __repr__(self):
+        """ Returns the name of the marker """
+        return self.name
+
+
+# stands for a cached None result, since caches never store None
+_NONE = _Marker('_NONE')
+# separates positional from keyword arguments in a key
+_KWARGS = _Marker('_KWARGS')
+_FAST_TYPES = {int, str}
+
+
+def make_key(args, kwargs, typed=False):
+    """
+    Builds a hashable cache key from the arguments of a call.
+
+    A single int or str argument is its own key, which saves building
+    a tuple on the hottest path. Keyword arguments are matched in the
+    order they are given, like functools.lru_cache.
+
+    Args:
+        args (tuple): The positional arguments.
+        kwargs (dict): The keyword arguments.
+        typed (bool): Whether 1 and 1.0 give different keys.
+
+    Returns:
+        The key.
+    """
+    if not kwargs and not typed and len(args) == 1 and \
+            type(args[0]) in _FAST_TYPES:
+        return args[0]
+    key = args
+    if kwargs:
+        key += (_KWARGS,) + tuple(kwargs.items())
+    if typed:
+        key += tuple(type(arg) for arg in args)
+        if kwargs:
+            key += tuple(type(arg) for arg in kwargs.values())
+    return key
+
+
+def _single_argument(func, wrapper):
+    """
+    Fits a wrapper of one argument to func, when func takes exactly
+    one argument without default.
+
+    The parameter of the wrapper is renamed after the one of func, so
+    that the wrapper accepts the same calls, by position or keyword.
+
+    Args:
+        func: The function to memoize.
+        wrapper: A function of one positional argument.
+
+    Returns:
+        The wrapper, or None if it cannot accept the calls of func.
+    """
+    try:
+        params = list(signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return None
+    if len(params) != 1 or params[0].default is not Parameter.empty:
+        return None
+    if params[0].kind is Parameter.POSITIONAL_ONLY:
+        return wrapper
+    if params[0].kind is not Parameter.POSITIONAL_OR_KEYWORD:
+        return None
+    code = wrapper.__code__
+    name = params[0].name
+    # CodeType.replace needs Python 3.8; the name must not hide another
+    if not hasattr(code, 'replace') or \
+            name in code.co_varnames + code.co_freevars + code.co_names:
+        return None
+    wrapper.__code__ = code.replace(co_varnames=(name,) +
+                                    code.co_varnames[1:])
+    return wrapper
+
+
+def memoize(policy, max_items=None, ttl=None, stats=False, typed=False,
+            **kwargs):
+    """
+    Returns a decorator caching the results of a function.
+
+    Every decorated function gets its own policy instance, exposed as
+    its cache attribute, and a cache_clear() function. A call does one
+    get and, on a miss only, one put; the cache methods are bound once
+    at decoration time. Arguments must be hashable.
+
+    A function of a single argument gets a wrapper of a single
+    argument of the same name, which is its own key: calls skip
+    packing *args and **kwargs and building a key, and are accepted
+    by position or keyword like calls of the function.
+
+    A policy with a default_path, such as SharedCache, gets a file of
+    its own per function unless a path is given, since keys do not
+    name the function.
+
+    Args:
+        policy: The BaseCaching subclass deciding what to evict.
+        max_items (int): The number of results kept per function.
+        ttl (float): How long a result stays valid, in seconds.
+        stats (bool): Whether to record a CacheStats in cache.stats.
+        typed (bool): Whether 1 and 1.0 are cached apart.
+        kwargs: Other arguments given to the policy, which is silent
+            on evictions unless on_evict is given.
+
+    Returns:
+        The decorator.
+    """
+    kwargs.setdefault('on_evict', None)
+
+    def decorator(func):
+        """ Wraps func with its own cache """
+        options = dict(kwargs)
+        if 'path' not in options and hasattr(policy, 'default_path'):
+            # keys are bare arguments, so functions must not share a file
+            name = '{}.{}'.format(func.__module__, func.__qualname__)
+            options['path'] = '{}.{:08x}'.format(
+                policy.default_path(), zlib.crc32(name.encode()))
+
+        def new_cache():
+            """ Builds an empty cache for func """
+            return policy(max_items=max_items, ttl=ttl, stats=stats,
+                          **options)
+
+        cache = new_cache()
+        get, put = cache.get, cache.put
+
+        def fast(arg):
+            """ Returns the cached result of func, computing it once """
+            result = get(arg)
+            if result is None:
+                if arg is None:
+                    # None cannot be a key, the generic path wraps it
+                    return memoized(arg)
+                result = func(arg)
+                put(arg, _NONE if result is None else result)
+                return result
+            return None if result is _NONE else result
+
+        def memoized(*args, **kw):
+            """ Returns the cached result of func, computing it once """
+            # the positional-only cases of make_key, inlined
+            if kw or typed:
+                key = make_key(args, kw, typed)
+            elif len(args) == 1 and type(args[0]) in _FAST_TYPES:
+                key = args[0]
+            else:
+                key = args
+            result = get(key)
+            if result is None:
+                result = func(*args, **kw)
+                put(key, _NONE if result is None else result)
+                return result
+            return None if result is _NONE else result
+
+        def cache_clear():
+            """ Forgets every cached result """
+            nonlocal get, put
+            wrapper.cache = new_cache()
+            get, put = wrapper.cache.get, wrapper.cache.put
+
+        wrapper = None if typed else _single_argument(func, fast)
+        wrapper = wraps(func)(wrapper or memoized)
+        wrapper.cache = cache
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,20 @@
+#!/usr/bin/python3
+
+""" 9-main """
+
+TieredCache = __import__('9-tiered_cache').TieredCache
+LRUCache = __import__('3-lru_cache').LRUCache
+
+my_cache = TieredCache(LRUCache, max_items=2, max_disk_items=2)
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.print_cache()
+print(my_cache.get("A"))
+my_cache.print_cache()
+my_cache.put("D", "School")
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+print(my_cache.get("B"))
+print(my_cache.get("Z"))
+my_cache.close()
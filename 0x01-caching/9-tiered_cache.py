@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+
+"""
+This module implements a TieredCache that keeps its hot items in a
+caching policy and spills the evicted ones to a log file on disk.
+"""
+
+import os
+import pickle
+import struct
+import tempfile
+from base_caching import print_discard
+from collections.abc import MutableMapping
+from time import time
+
+
+class DiskStore(MutableMapping):
+    """
+    DiskStore is a dictionary-like store kept in an append-only log.
+
+    Every write appends a record made of a header (key length, item
+    length) and the pickled key and item; a delete appends a record
+    whose item length is TOMBSTONE. Only the position of the latest
+    item of every key is kept in memory, so reading an item costs one
+    pread. When more than half of the log is made of outdated records,
+    the live ones are copied to a fresh log that replaces the old one.
+
+    Opening an existing log replays it to rebuild the index; a record
+    cut short by a crash is dropped. Keys iterate from the oldest write
+    to the newest.
+
+    Attributes:
+        path (str): The log file.
+    """
+
+    RECORD = struct.Struct('<II')
+    TOMBSTONE = 0xFFFFFFFF
+    COMPACT_SIZE = 1 << 20
+
+    def __init__(self, path):
+        """
+        Opens the log, creating it when needed.
+
+        Args:
+            path (str): The log file.
+        """
+        self.path = path
+        self.__open()
+
+    def __open(self):
+        """
+        Opens the log and replays it into the index.
+
+        The log is streamed record by record: the header and the key
+        of every record are read, and its item is skipped.
+        """
+        self.__fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.__index = {}
+        self.__garbage = 0
+        size = os.fstat(self.__fd).st_size
+        offset = 0
+        header = self.RECORD.size
+        while offset + header <= size:
+            key_len, item_len = self.RECORD.unpack(
+                os.pread(self.__fd, header, offset))
+            start = offset + header
+            tombstone = item_len == self.TOMBSTONE
+            end = start + key_len + (0 if tombstone else item_len)
+            if end > size:
+                break
+            key = pickle.loads(os.pread(self.__fd, key_len, start))
+            self.__forget(key)
+            if tombstone:
+                self.__garbage += end - offset
+            else:
+                self.__index[key] = (start + key_len, item_len,
+                                     end - offset)
+            offset = end
+        if offset < size:
+            os.ftruncate(self.__fd, offset)
+        self.__size = offset
+
+    def close(self):
+        """
+        Closes the log; its entries stay on disk.
+        """
+        os.close(self.__fd)
+
+    def __forget(self, key):
+        """
+        Drops a key from the index, counting its record as garbage.
+        """
+        entry = self.__index.pop(key, None)
+        if entry is not None:
+            self.__garbage += entry[2]
+
+    def __append(self, key_bytes, item_bytes, item_len):
+        """
+        Appends a record and returns where its item starts.
+        """
+        header = self.RECORD.pack(len(key_bytes), item_len)
+        os.pwrite(self.__fd, header + key_bytes + item_bytes, self.__size)
+        start = self.__size + len(header) + len(key_bytes)
+        self.__size = start + len(item_bytes)
+        return start
+
+    def __getitem__(self, key):
+        """
+        Returns the item of a key.
+        """
+        offset, length, _ = self.__index[key]
+        return pickle.loads(os.pread(self.__fd, length, offset))
+
+    def __setitem__(self, key, item):
+        """
+        Appends the item of a key.
+        """
+        key_bytes = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        item_bytes = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        self.__forget(key)
+        start = self.__append(key_bytes, item_bytes, len(item_bytes))
+        self.__index[key] = (start, len(item_bytes),
+                             self.RECORD.size + len(key_bytes) +
+                             len(item_bytes))
+        self.__maybe_compact()
+
+    def __delitem__(self, key):
+        """
+        Appends a tombstone for a key.
+        """
+        if key not in self.__index:
+            raise KeyError(key)
+        self.__forget(key)
+        key_bytes = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        self.__append(key_bytes, b'', self.TOMBSTONE)
+        self.__garbage += self.RECORD.size + len(key_bytes)
+        self.__maybe_compact()
+
+    def __contains__(self, key):
+        """
+        Tells whether a key is stored, without reading its item.
+        """
+        return key in self.__index
+
+    def __iter__(self):
+        """
+        Iterates over the keys, oldest write first.
+        """
+        return iter(self.__index)
+
+    def __len__(self):
+        """
+        Returns the number of keys.
+        """
+        return len(self.__index)
+
+    def __maybe_compact(self):
+        """
+        Compacts the log once outdated records fill half of it.
+        """
+        if self.__size > self.COMPACT_SIZE and \
+                2 * self.__garbage > self.__size:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the log with the live records only.
+
+        The index of the new log is built from the records written,
+        so the new log is not replayed.
+        """
+        tmp = self.path + '.tmp'
+        index = {}
+        size = 0
+        with open(tmp, 'wb') as f:
+            for key, (offset, length, _) in self.__index.items():
+                key_bytes = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+                f.write(self.RECORD.pack(len(key_bytes), length))
+                f.write(key_bytes)
+                f.write(os.pread(self.__fd, length, offset))
+                record = self.RECORD.size + len(key_bytes) + length
+                index[key] = (size + record - length, length, record)
+                size += record
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.close()
+        self.__fd = os.open(self.path, os.O_RDWR)
+        self.__index = index
+        self.__garbage = 0
+        self.__size = size
+
+
+class TieredCache():
+    """
+    TieredCache puts an on-disk tier under any BaseCaching policy.
+
+    The policy holds the hot items in memory. The items it evicts are
+    written to a DiskStore instead of being lost, and a get missing
+    in memory looks on disk: a key found there is promoted back into
+    the policy, which may spill another one. An item is only really
+    discarded when the disk tier is bounded by max_disk_items and
+    overflows, oldest spilled first.
+
+    Items keep their time-to-live on disk: their expiry is written
+    with them and an expired item is never promoted.
+
+    Attributes:
+        memory: The policy instance holding the hot items.
+        disk (DiskStore): The items spilled by the policy.
+        max_disk_items (int): The number of items kept on disk,
+            None for no limit.
+        on_evict: Called with (key, item) when an item leaves both
+            tiers, or None.
+
+    Methods:
+        put(key, item): Adds an item to the cache.
+        get(key): Retrieves an item from the cache.
+        print_cache(): Prints the content of both tiers.
+        close(): Closes the disk tier.
+    """
+
+    def __init__(self, policy, path=None, max_disk_items=None,
+                 on_evict=print_discard, **kwargs):
+        """
+        Initialize an instance of TieredCache.
+
+        Args:
+            policy: The BaseCaching subclass of the memory tier.
+            path (str): The log of the disk tier. By default a
+                temporary file, removed by close().
+            max_disk_items (int): The number of items kept on disk,
+                None for no limit.
+            on_evict: Called with (key, item) when an item leaves both
+                tiers, or None.
+            kwargs: Other arguments given to the policy, such as
+                max_items, max_weight or ttl.
+        """
+        self.__temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.log')
+            os.close(fd)
+        self.memory = policy(on_evict=self.__spill, **kwargs)
+        self.disk = DiskStore(path)
+        self.max_disk_items = max_disk_items
+        self.on_evict = on_evict
+        self.__expires = {}
+
+    @property
+    def cache_data(self):
+        """
+        The items held in memory.
+        """
+        return self.memory.cache_data
+
+    def print_cache(self):
+        """
+        Prints the content of both tiers.
+        """
+        self.memory.print_cache()
+        print("On disk:")
+        for key in sorted(self.disk):
+            print("{}: {}".format(key, self.disk[key][1]))
+
+    def __spill(self, key, item):
+        """
+        Writes an item evicted from memory to disk.
+        """
+        self.__write(key, self.__expires.pop(key, None), item)
+
+    def __write(self, key, expires, item):
+        """
+        Writes an item to disk, discarding the oldest item on disk
+        when the disk tier overflows.
+        """
+        self.disk[key] = (expires, item)
+        if self.max_disk_items is not None and \
+                len(self.disk) > self.max_disk_items:
+            oldest = next(iter(self.disk))
+            item = self.disk.pop(oldest)[1]
+            if self.on_evict is not None:
+                self.on_evict(oldest, item)
+
+    def __store(self, key, item, ttl):
+        """
+        Puts an item in memory, or on disk when the policy refuses it.
+        """
+        if ttl is None:
+            ttl = self.memory.ttl
+        expires = None if ttl is None else time() + ttl
+        self.memory.put(key, item, ttl)
+        if key not in self.memory.cache_data:
+            self.__write(key, expires, item)
+        elif expires is not None:
+            self.__expires[key] = expires
+            # drop the expiries of the keys the policy let expire
+            if len(self.__expires) > 2 * len(self.memory.cache_data) + 64:
+                cached = self.memory.cache_data
+                self.__expires = {k: v for k, v in self.__expires.items()
+                                  if k in cached}
+        else:
+            self.__expires.pop(key, None)
+
+    def put(self, key, item, ttl=None):
+        """
+        Adds an item to the memory tier, replacing any copy on disk.
+
+        Args:
+            key: The key of the item.
+            item: The item to be added to the cache.
+            ttl: Its time-to-live in seconds, defaults to the policy ttl.
+
+        Returns:
+            None
+        """
+        if key is None or item is None:
+            return
+        if key in self.disk:
+            del self.disk[key]
+        self.__store(key, item, ttl)
+
+    def get(self, key):
+        """
+        Retrieves an item from memory, or promotes it from disk.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The item associated with the key, or None if the key
+                does not exist in the cache.
+        """
+        item = self.memory.get(key)
+        if item is not None or key not in self.disk:
+            return item
+        expires, item = self.disk.pop(key)
+        ttl = None
+        if expires is not None:
+            ttl = expires - time()
+            if ttl <= 0:
+                return None
+        self.__store(key, item, ttl)
+        return item
+
+    def close(self):
+        """
+        Closes the disk tier, removing its log if it was temporary.
+        """
+        self.disk.close()
+        if self.__temporary:
+            os.remove(self.disk.path)
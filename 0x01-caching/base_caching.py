@@ -4,18 +4,69 @@
 BaseCaching module
 """
 
+import os
+import pickle
+import sys
+from cache_stats import CacheStats
+from heapq import heapify, heappop, heappush
+from itertools import count
+from threading import RLock, Thread
+from time import monotonic, perf_counter_ns, time
+
+
+def print_discard(key, item):
+    """ Default eviction listener: print the discarded key
+    """
+    print("DISCARD: {}".format(key))
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - how much your cache can hold (in items and/or weight)
+      - how long your items live (optional time-to-live)
+      - who hears about evictions (on_evict listener)
+      - what happened to your cache (optional statistics)
+      - how your cache survives a restart (snapshots)
     """
     MAX_ITEMS = 4
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_weight=None, weigher=None,
+                 ttl=None, on_evict=print_discard, stats=False):
         """ Initiliaze
+
+        Args:
+            max_items: The maximum number of items. Defaults to MAX_ITEMS,
+                or to no limit when only max_weight is given.
+            max_weight: The maximum total weight of the items,
+                or None to only bound the number of items.
+            weigher: A callable returning the weight of an item,
+                defaults to sys.getsizeof. Only used with max_weight.
+            ttl: The default time-to-live of the items in seconds,
+                or None for items that never expire.
+            on_evict: A callable called with the key and the item of
+                every evicted entry, or None to ignore evictions.
+            stats: True to record a CacheStats in self.stats.
+                Disabled caches pay nothing for it.
         """
         self.cache_data = {}
+        if max_items is None and max_weight is None:
+            max_items = self.MAX_ITEMS
+        self.max_items = max_items
+        self.max_weight = max_weight
+        self.weigher = weigher if weigher is not None else sys.getsizeof
+        self.cache_weight = 0
+        self.__weights = {} if max_weight is not None else None
+        self.ttl = ttl
+        self.__deadlines = {}
+        self.__heap = []
+        self.__order = count()
+        self.on_evict = on_evict
+        self.stats = None
+        if stats:
+            self.stats = CacheStats()
+            self.__instrument()
 
     def print_cache(self):
         """ Print the cache
@@ -24,7 +75,7 @@ class BaseCaching():
         for key in sorted(self.cache_data.keys()):
             print("{}: {}".format(key, self.cache_data.get(key)))
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
         """
         raise NotImplementedError("put must be implemented in your cache class")
@@ -33,3 +84,394 @@ class BaseCaching():
         """ Get an item by key
         """
         raise NotImplementedError("get must be implemented in your cache class")
+
+    def get_many(self, keys):
+        """ Get several items by key
+
+        Args:
+            keys: An iterable of keys.
+
+        Returns:
+            A dictionary of the items found, by key.
+        """
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    def put_many(self, items, ttl=None):
+        """ Add several items in the cache, in order
+
+        Args:
+            items: A mapping or an iterable of (key, item) pairs.
+            ttl: Their time-to-live in seconds, defaults to self.ttl.
+        """
+        for key, item in self._pairs(items):
+            self.put(key, item, ttl)
+
+    def __instrument(self):
+        """ Shadow the cache methods with versions feeding self.stats
+        """
+        # policies replace cache_data after this runs, so look it up late
+        stats, cache_data = self.stats, lambda: self.cache_data
+        get, put = self.get, self.put
+        get_many, put_many = self.get_many, self.put_many
+
+        def timed_get(key):
+            """ get, recorded in stats """
+            start = perf_counter_ns()
+            item = get(key)
+            stats.record_get(item is not None, perf_counter_ns() - start)
+            return item
+
+        def timed_put(key, item, ttl=None):
+            """ put, recorded in stats """
+            start = perf_counter_ns()
+            overwrite = key in cache_data()
+            put(key, item, ttl)
+            stats.record_put(overwrite, perf_counter_ns() - start)
+
+        def counted_get_many(keys):
+            """ get_many, counted in stats """
+            keys = list(keys)
+            found = get_many(keys)
+            stats.hits += len(found)
+            stats.misses += len(keys) - len(found)
+            return found
+
+        def counted_put_many(items, ttl=None):
+            """ put_many, counted in stats """
+            items = list(self._pairs(items))
+            data = cache_data()
+            stats.puts += len(items)
+            stats.overwrites += sum(1 for key, _ in items if key in data)
+            put_many(items, ttl)
+
+        self.get, self.put = timed_get, timed_put
+        # the generic bulk methods go through the timed get and put
+        if type(self).get_many is not BaseCaching.get_many:
+            self.get_many = counted_get_many
+        if type(self).put_many is not BaseCaching.put_many:
+            self.put_many = counted_put_many
+
+    @staticmethod
+    def _pairs(items):
+        """ Return the (key, item) pairs of a mapping or an iterable
+        """
+        return items.items() if hasattr(items, 'items') else items
+
+    def expire(self):
+        """ Remove every expired item
+
+        Expired items are also removed lazily when they are read.
+
+        Returns:
+            The number of items removed.
+        """
+        heap, deadlines = self.__heap, self.__deadlines
+        now = monotonic()
+        removed = 0
+        while heap and heap[0][0] <= now:
+            deadline, _, key = heappop(heap)
+            if deadlines.get(key) == deadline:
+                self._remove(key)
+                removed += 1
+        if self.stats is not None:
+            self.stats.expirations += removed
+        return removed
+
+    def dump(self, path):
+        """ Save the items and the policy state to a snapshot file
+
+        The file is a stream of pickled records, written to a temporary
+        file first so that an existing snapshot is replaced atomically.
+
+        Args:
+            path: The snapshot file.
+        """
+        now, wall = monotonic(), time()
+        deadlines = self.__deadlines
+        tmp = "{}.tmp".format(path)
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump({'format': 1, 'policy': type(self).__name__},
+                            f, pickle.HIGHEST_PROTOCOL)
+                for key, state in list(self._snapshot()):
+                    if self._expired(key):
+                        continue
+                    deadline = deadlines.get(key) if deadlines else None
+                    expires = None if deadline is None \
+                        else wall + deadline - now
+                    pickle.dump((key, self.cache_data[key], state, expires),
+                                f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(None, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def load(self, path, block=True):
+        """ Fill the cache from a snapshot file
+
+        Entries are restored with their policy state when the snapshot
+        comes from the same policy, and keep the rest of their
+        time-to-live. Keys already in the cache, and keys put while a
+        background load runs, are fresher: they are left alone, and the
+        entries of the snapshot are restored behind them, in the order
+        they were saved, without discarding any of them. When the cache
+        is too small, the entries saved last are the ones kept.
+
+        Args:
+            path: The snapshot file.
+            block: False to read the snapshot in a background thread
+                while the cache keeps serving; until the thread is done,
+                get, put, get_many, put_many, expire, dump and
+                print_cache take a lock shared with the loader.
+
+        Returns:
+            The loader Thread when block is False, otherwise None.
+        """
+        if block:
+            self.__load(path, None)
+            return None
+        lock = RLock()
+        names = ('get', 'put', 'get_many', 'put_many', 'expire', 'dump',
+                 'print_cache')
+        shadowed = {name: self.__dict__[name] for name in names
+                    if name in self.__dict__}
+
+        def locked(method):
+            """ method, holding the loader lock """
+            def call(*args, **kwargs):
+                """ locked call """
+                with lock:
+                    return method(*args, **kwargs)
+            return call
+
+        for name in names:
+            setattr(self, name, locked(getattr(self, name)))
+
+        def run():
+            """ load, then give the cache its own methods back """
+            try:
+                self.__load(path, lock)
+            finally:
+                with lock:
+                    for name in names:
+                        if name in shadowed:
+                            setattr(self, name, shadowed[name])
+                        else:
+                            delattr(self, name)
+
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def __load(self, path, lock):
+        """ Restore the records of a snapshot file, one by one
+
+        The records are restored from the last saved to the first, each
+        one behind the keys already cached (see _restore), so that they
+        end up in their saved order behind the live keys.
+        """
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            same_policy = header.get('policy') == type(self).__name__
+            records = []
+            while True:
+                record = pickle.load(f)
+                if record is None:
+                    break
+                records.append(record)
+        for key, item, state, expires in reversed(records):
+            ttl = None
+            if expires is not None:
+                ttl = expires - time()
+                if ttl <= 0:
+                    continue
+            if lock is None:
+                self.__restore_one(key, item, state, ttl, same_policy)
+            else:
+                with lock:
+                    self.__restore_one(key, item, state, ttl,
+                                       same_policy)
+
+    def __restore_one(self, key, item, state, ttl, same_policy):
+        """ Restore a snapshot record unless the key is already cached
+        or the cache has no room left for it
+        """
+        if key in self.cache_data:
+            return
+        if self.__heap and self.__heap[0][0] <= monotonic():
+            self.expire()
+        if self.max_items is not None and \
+                len(self.cache_data) >= self.max_items:
+            return
+        if self.__weights is not None and \
+                self.cache_weight + self.weigher(item) > self.max_weight:
+            return
+        self._restore(key, item, state if same_policy else None, ttl)
+
+    def _snapshot(self):
+        """ Yield the (key, state) pairs to save, in restore order
+
+        The default follows cache_data, whose order is the policy order
+        for the ordered policies, with no extra state.
+        """
+        for key in self.cache_data:
+            yield key, None
+
+    def _restore(self, key, item, state, ttl):
+        """ Store a key read from a snapshot behind the cached keys
+
+        The cache has room for the key, and the key is older than
+        every cached one: it goes where the policy keeps its oldest
+        keys.
+
+        Args:
+            key: The key.
+            item: Its item.
+            state: The state saved by _snapshot, or None.
+            ttl: The rest of its time-to-live, or None.
+
+        The default goes through the put of the class, which skips
+        the stats and the loader lock the instance may be wrapped in,
+        then moves the key to the front of an ordered cache_data.
+        """
+        type(self).put(self, key, item, ttl)
+        if key in self.cache_data and hasattr(self.cache_data,
+                                              'move_to_end'):
+            self.cache_data.move_to_end(key, last=False)
+
+    def _victim(self):
+        """ Return the key the policy discards first
+        """
+        raise NotImplementedError("_victim must be implemented "
+                                  "in your cache class")
+
+    def _remove(self, key):
+        """ Remove a key from the cache and return its item
+
+        Policies keeping side structures extend this to forget the key.
+        """
+        item = self.cache_data.pop(key)
+        if self.__weights is not None:
+            self.cache_weight -= self.__weights.pop(key)
+        if self.__deadlines:
+            self.__deadlines.pop(key, None)
+        return item
+
+    def _discard(self, key):
+        """ Evict a key chosen by the policy and notify on_evict
+        """
+        item = self._remove(key)
+        if self.stats is not None:
+            self.stats.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, item)
+
+    def _expired(self, key):
+        """ Remove a key if its time-to-live is over
+
+        Returns:
+            True if the key has just been removed.
+        """
+        if self.__deadlines:
+            deadline = self.__deadlines.get(key)
+            if deadline is not None and deadline <= monotonic():
+                self._remove(key)
+                if self.stats is not None:
+                    self.stats.expirations += 1
+                return True
+        return False
+
+    def _schedule(self, key, ttl=None):
+        """ Set when a key expires
+
+        Args:
+            key: The key just stored.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is None:
+            if self.__deadlines:
+                self.__deadlines.pop(key, None)
+            return
+        deadline = monotonic() + ttl
+        self.__deadlines[key] = deadline
+        heappush(self.__heap, (deadline, next(self.__order), key))
+        # drop the entries left behind by overwritten or removed keys
+        if len(self.__heap) > 2 * len(self.__deadlines) + 64:
+            self.__heap = [entry for entry in self.__heap
+                           if self.__deadlines.get(entry[2]) == entry[0]]
+            heapify(self.__heap)
+
+    def _weigh(self, item):
+        """ Return the weight of an item, None if it can never fit
+
+        Puts call it before touching the cache, so that an item that
+        can never fit neither replaces the item of its key nor
+        discards any other one.
+        """
+        if self.max_items is not None and self.max_items < 1:
+            return None
+        if self.__weights is None:
+            return 0
+        weight = self.weigher(item)
+        if weight > self.max_weight:
+            return None
+        return weight
+
+    def _admit(self, key, item, ttl=None, make_room=True, weight=None):
+        """ Discard items until a new key fits in the cache
+
+        Expired items are dropped before any live item is discarded.
+        The caller stores the key right after a successful admission.
+
+        Args:
+            key: The new key.
+            item: The item to store.
+            ttl: Its time-to-live in seconds, defaults to self.ttl.
+            make_room: False to leave the eviction to a later _shrink.
+            weight: Its weight, as returned by _weigh, if known.
+
+        Returns:
+            True if the key can be stored, False if it can never fit.
+        """
+        if weight is None:
+            weight = self._weigh(item)
+            if weight is None:
+                return False
+        if make_room and self.__heap and self.__heap[0][0] <= monotonic():
+            self.expire()
+        if self.max_items is not None:
+            while make_room and len(self.cache_data) >= self.max_items:
+                self._discard(self._victim())
+        if self.__weights is not None:
+            while make_room and \
+                    self.cache_weight + weight > self.max_weight:
+                self._discard(self._victim())
+            self.__weights[key] = weight
+            self.cache_weight += weight
+        self._schedule(key, ttl)
+        return True
+
+    def _shrink(self):
+        """ Discard items until the cache is back within its capacity
+
+        Used after keys are stored with _admit(..., make_room=False).
+        """
+        if self.__heap and self.__heap[0][0] <= monotonic():
+            self.expire()
+        if self.max_items is not None:
+            while len(self.cache_data) > self.max_items:
+                self._discard(self._victim())
+        if self.__weights is not None:
+            while self.cache_weight > self.max_weight:
+                self._discard(self._victim())
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+
+"""
+This module provides micro-benchmarks and a trace-driven simulator
+for the caching policies.
+
+Usage:
+    ./benchmark.py latency    # per-operation latency by cache size
+    ./benchmark.py memory     # memory held per million entries
+    ./benchmark.py hitrate [trace_file]
+                              # hit ratio of every policy on a trace,
+                              # one key per line (default: hot keys
+                              # mixed with periodic scans)
+    ./benchmark.py simulate [zipf|scan|loop|trace_file] [capacity ...]
+                              # hit ratio, throughput and peak memory
+                              # of every policy for each capacity
+    ./benchmark.py memoize    # memoize decorator against get/put pairs
+"""
+
+import random
+import sys
+import tracemalloc
+from collections import OrderedDict
+from time import perf_counter
+
+POLICIES = {
+    'FIFO': ('1-fifo_cache', 'FIFOCache'),
+    'LIFO': ('2-lifo_cache', 'LIFOCache'),
+    'LRU': ('3-lru_cache', 'LRUCache'),
+    'MRU': ('4-mru_cache', 'MRUCache'),
+    'LFU': ('100-lfu_cache', 'LFUCache'),
+    'ARC': ('101-arc_cache', 'ARCCache'),
+    'TinyLFU': ('102-tinylfu_cache', 'TinyLFUCache'),
+}
+SIZES = (4, 100, 10000, 1000000)
+
+
+def policy(name):
+    """
+    Returns the cache class of a policy.
+
+    Args:
+        name (str): The policy name, a key of POLICIES.
+
+    Returns:
+        The BaseCaching subclass implementing the policy.
+    """
+    module, cls = POLICIES[name]
+    return getattr(__import__(module), cls)
+
+
+def filled(name, size):
+    """
+    Returns a cache of a policy filled up to its capacity.
+
+    Args:
+        name (str): The policy name.
+        size (int): The capacity of the cache.
+    """
+    cache = policy(name)(max_items=size, on_evict=None)
+    for key in range(size):
+        cache.put(key, key)
+    return cache
+
+
+def latency(name, size, ops=20000):
+    """
+    Measures the mean latency of overwrites and evictions.
+
+    Overwrites put again keys that are already cached, evictions
+    put new keys into a full cache.
+
+    Args:
+        name (str): The policy name.
+        size (int): The capacity of the cache.
+        ops (int): The number of operations timed.
+
+    Returns:
+        tuple: The mean overwrite and eviction latencies in ns.
+    """
+    cache = filled(name, size)
+    keys = [random.randrange(size) for _ in range(ops)]
+    start = perf_counter()
+    for key in keys:
+        cache.put(key, key)
+    overwrite = (perf_counter() - start) / ops * 1e9
+    start = perf_counter()
+    for key in range(size, size + ops):
+        cache.put(key, key)
+    evict = (perf_counter() - start) / ops * 1e9
+    return overwrite, evict
+
+
+def report_latency(names=('FIFO', 'LIFO'), sizes=SIZES):
+    """
+    Prints the overwrite and eviction latencies of some policies.
+
+    Flat numbers across sizes show the operations are O(1).
+    """
+    print("{:<6}{:>10}{:>16}{:>14}".format(
+        "policy", "size", "overwrite (ns)", "evict (ns)"))
+    for name in names:
+        for size in sizes:
+            overwrite, evict = latency(name, size)
+            print("{:<6}{:>10}{:>16.0f}{:>14.0f}".format(
+                name, size, overwrite, evict))
+
+
+def two_stores(size):
+    """
+    Returns the items and the recency order held in two structures,
+    as LRUCache and MRUCache used to do, for comparison.
+
+    Args:
+        size (int): The number of entries.
+    """
+    cache_data, order = {}, OrderedDict()
+    for key in range(size):
+        cache_data[key] = key
+        order[key] = key
+    return cache_data, order
+
+
+def memory(build, size):
+    """
+    Measures the memory allocated to build a structure.
+
+    Args:
+        build: A callable taking the number of entries.
+        size (int): The number of entries.
+
+    Returns:
+        int: The number of bytes still allocated once built.
+    """
+    tracemalloc.start()
+    kept = build(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def report_memory(names=('LRU', 'MRU'), size=1000000):
+    """
+    Prints the memory held by some policies for a million entries,
+    next to the former layout storing every item twice.
+    """
+    builds = [("dict + OrderedDict", two_stores)]
+    for name in names:
+        builds.append((name, lambda n, name=name: filled(name, n)))
+    print("{:<20}{:>16}".format("layout", "MiB per 1M"))
+    for label, build in builds:
+        held = memory(build, size) * 1000000 / size
+        print("{:<20}{:>16.1f}".format(label, held / 2 ** 20))
+
+
+def load_trace(path):
+    """
+    Reads a recorded trace.
+
+    Args:
+        path (str): A text file holding one key per line.
+
+    Returns:
+        list: The keys, in order.
+    """
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def scan_trace(hot=100, scan=400, rounds=50, seed=0):
+    """
+    Builds a trace of hot keys interrupted by one-off scans.
+
+    Args:
+        hot (int): The number of hot keys.
+        scan (int): The number of cold keys read by every scan.
+        rounds (int): The number of hot phases, each followed by a scan.
+        seed (int): The random seed.
+
+    Returns:
+        list: The keys, in order.
+    """
+    rand = random.Random(seed)
+    trace, cold = [], 0
+    for _ in range(rounds):
+        trace.extend("hot{}".format(rand.randrange(hot))
+                     for _ in range(hot * 10))
+        trace.extend("cold{}".format(cold + n) for n in range(scan))
+        cold += scan
+    return trace
+
+
+def zipf_trace(keys=10000, length=100000, skew=0.99, seed=0):
+    """
+    Builds a trace whose key popularity follows a Zipf law.
+
+    Args:
+        keys (int): The number of distinct keys.
+        length (int): The number of reads.
+        skew (float): The Zipf exponent, higher is more skewed.
+        seed (int): The random seed.
+
+    Returns:
+        list: The keys, in order.
+    """
+    weights = [1 / rank ** skew for rank in range(1, keys + 1)]
+    rand = random.Random(seed)
+    return ["zipf{}".format(key) for key in
+            rand.choices(range(keys), weights=weights, k=length)]
+
+
+def loop_trace(keys=1000, rounds=50):
+    """
+    Builds a trace reading the same keys in a loop, the worst case
+    of LRU as soon as the loop does not fit in the cache.
+
+    Args:
+        keys (int): The number of keys in the loop.
+        rounds (int): The number of loops.
+
+    Returns:
+        list: The keys, in order.
+    """
+    return ["loop{}".format(key) for _ in range(rounds)
+            for key in range(keys)]
+
+
+TRACES = {'zipf': zipf_trace, 'scan': scan_trace, 'loop': loop_trace}
+
+
+def replay(name, trace, capacity):
+    """
+    Replays a trace through a cache, loading every missed key.
+
+    Args:
+        name (str): The policy name.
+        trace (list): The keys read, in order.
+        capacity (int): The capacity of the cache.
+
+    Returns:
+        tuple: The number of hits and the cache.
+    """
+    cache = policy(name)(max_items=capacity, on_evict=None)
+    get, put = cache.get, cache.put
+    hits = 0
+    for key in trace:
+        if get(key) is None:
+            put(key, True)
+        else:
+            hits += 1
+    return hits, cache
+
+
+def hit_ratio(name, trace, capacity):
+    """
+    Returns the share of the reads of a trace that hit the cache.
+
+    Args:
+        name (str): The policy name.
+        trace (list): The keys read, in order.
+        capacity (int): The capacity of the cache.
+    """
+    hits, _ = replay(name, trace, capacity)
+    return hits / len(trace) if trace else 0.0
+
+
+def simulate(name, trace, capacity):
+    """
+    Measures how a policy does on a trace.
+
+    The trace is replayed twice: once timed, once under tracemalloc,
+    which would otherwise slow the timed run down.
+
+    Args:
+        name (str): The policy name.
+        trace (list): The keys read, in order.
+        capacity (int): The capacity of the cache.
+
+    Returns:
+        tuple: The hit ratio, the operations per second and
+            the peak memory allocated by the replay in bytes.
+    """
+    start = perf_counter()
+    hits, _ = replay(name, trace, capacity)
+    elapsed = perf_counter() - start
+    tracemalloc.start()
+    kept = replay(name, trace, capacity)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (hits / len(trace) if trace else 0.0,
+            len(trace) / elapsed if elapsed else 0.0, peak)
+
+
+def report_simulation(trace, capacities=(100, 1000, 5000)):
+    """
+    Prints the hit ratio, throughput and peak memory of every policy
+    on a trace, for each capacity.
+    """
+    print("{:<8}{:>10}{:>10}{:>12}{:>12}".format(
+        "policy", "capacity", "hit ratio", "kops/s", "peak KiB"))
+    for capacity in capacities:
+        for name in POLICIES:
+            ratio, ops, peak = simulate(name, trace, capacity)
+            print("{:<8}{:>10}{:>10.3f}{:>12.0f}{:>12.0f}".format(
+                name, capacity, ratio, ops / 1000, peak / 1024))
+
+
+def report_hit_ratio(trace, capacities=(50, 100, 200)):
+    """
+    Prints the hit ratio of every policy on a trace.
+    """
+    print("{:<8}".format("policy") +
+          "".join("{:>10}".format(c) for c in capacities))
+    for name in POLICIES:
+        print("{:<8}".format(name) + "".join(
+            "{:>10.3f}".format(hit_ratio(name, trace, capacity))
+            for capacity in capacities))
+
+
+def report_memoize(name='LRU', keys=1000, calls=200000):
+    """
+    Prints the cost of a memoized call, through the memoize decorator
+    and through the usual hand-written lookup around the same function,
+    which checks cache_data before calling get then put.
+    """
+    memoize = __import__('8-memoize').memoize
+    cls = policy(name)
+
+    def square(n):
+        """ the memoized function """
+        return n * n
+
+    decorated = memoize(cls, max_items=keys)(square)
+    cache = cls(max_items=keys, on_evict=None)
+
+    def by_hand(n):
+        """ the usual membership test and get/put pair """
+        if n in cache.cache_data:
+            return cache.get(n)
+        result = square(n)
+        cache.put(n, result)
+        return result
+
+    args = [random.randrange(keys + keys // 10) for _ in range(calls)]
+    print("{:<12}{:>10}".format("caller", "ns/call"))
+    for label, func in (("by hand", by_hand), ("memoize", decorated)):
+        best = float('inf')
+        for _ in range(5):
+            start = perf_counter()
+            for arg in args:
+                func(arg)
+            best = min(best, perf_counter() - start)
+        print("{:<12}{:>10.0f}".format(label, best / calls * 1e9))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'latency'
+    if command == 'latency':
+        report_latency()
+    elif command == 'memory':
+        report_memory()
+    elif command == 'hitrate':
+        report_hit_ratio(load_trace(sys.argv[2]) if len(sys.argv) > 2
+                         else scan_trace())
+    elif command == 'simulate':
+        source = sys.argv[2] if len(sys.argv) > 2 else 'zipf'
+        trace = TRACES[source]() if source in TRACES \
+            else load_trace(source)
+        capacities = [int(arg) for arg in sys.argv[3:]]
+        report_simulation(trace, capacities or (100, 1000, 5000))
+    elif command == 'memoize':
+        report_memoize()
+    else:
+        print("Usage: {} latency|memory|hitrate|simulate|memoize".format(
+            sys.argv[0]))
+        sys.exit(1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+This module provides the CacheStats class that counts
+what happens in a cache and how long its calls take.
+"""
+
+
+class CacheStats():
+    """
+    CacheStats holds the counters and latency histograms of a cache.
+
+    Latencies are recorded in power of two buckets of nanoseconds:
+    bucket n counts the calls that took less than 2 ** n ns and
+    at least 2 ** (n - 1) ns.
+
+    Attributes:
+        hits (int): The number of reads that found their key.
+        misses (int): The number of reads that did not.
+        puts (int): The number of items put.
+        overwrites (int): The number of puts replacing an item.
+        evictions (int): The number of items discarded by the policy.
+        expirations (int): The number of items dropped by their ttl.
+        get_latency (list): The histogram of get latencies.
+        put_latency (list): The histogram of put latencies.
+    """
+
+    BUCKETS = 64
+
+    def __init__(self):
+        """
+        Initializes every counter to zero.
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        Sets every counter back to zero.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.overwrites = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.get_latency = [0] * self.BUCKETS
+        self.put_latency = [0] * self.BUCKETS
+
+    def record_get(self, hit, elapsed):
+        """
+        Records a read.
+
+        Args:
+            hit (bool): Whether the key was found.
+            elapsed (int): How long the read took in ns.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.get_latency[min(elapsed.bit_length(), self.BUCKETS - 1)] += 1
+
+    def record_put(self, overwrite, elapsed):
+        """
+        Records a put.
+
+        Args:
+            overwrite (bool): Whether the key was already cached.
+            elapsed (int): How long the put took in ns.
+        """
+        self.puts += 1
+        if overwrite:
+            self.overwrites += 1
+        self.put_latency[min(elapsed.bit_length(), self.BUCKETS - 1)] += 1
+
+    @staticmethod
+    def __histogram(buckets):
+        """
+        Returns the non empty buckets of a histogram
+        by their upper bound in ns.
+        """
+        return {2 ** n: hits for n, hits in enumerate(buckets) if hits}
+
+    def snapshot(self, reset=False):
+        """
+        Returns a copy of the counters.
+
+        Args:
+            reset (bool): Whether to set the counters back to zero,
+                so that periodic snapshots never overlap.
+
+        Returns:
+            dict: The counters, the hit ratio and the histograms.
+        """
+        reads = self.hits + self.misses
+        snapshot = {
+            'hits': self.hits, 'misses': self.misses,
+            'hit_ratio': self.hits / reads if reads else None,
+            'puts': self.puts, 'overwrites': self.overwrites,
+            'evictions': self.evictions, 'expirations': self.expirations,
+            'get_latency_ns': self.__histogram(self.get_latency),
+            'put_latency_ns': self.__histogram(self.put_latency),
+        }
+        if reset:
+            self.reset()
+        return snapshot